@@ -0,0 +1,109 @@
+"""
+Cross-worker classification batcher for AutoSorter.
+
+Worker threads hand the texts of their file batches to a shared
+ClassifyBatcher instead of calling the classifier directly. A single
+background thread collects texts for a short window and sends them to
+the classifier's classify_batch() together, so small batches from
+different workers share one encode call instead of paying the per-call
+model overhead each. A window that collects only one text goes to
+classify() instead.
+
+The batcher thread only gathers texts; with an executor the batches are
+classified there, so several batches can run at once.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Queue sentinel that stops the batcher thread
+_STOP = None
+
+
+class ClassifyBatcher:
+    """Collects texts from many threads into classify_batch() calls."""
+
+    def __init__(self, classify_batch, batch_size=16, wait_ms=50, classify=None, executor=None):
+        """Start the batcher thread.
+
+        Args:
+            classify_batch: Callable taking a list of texts and returning a
+                            list of (category, score) tuples in order.
+            batch_size: Most texts sent to classify_batch at once.
+            wait_ms: How long the first text of a batch waits for more.
+            classify: Optional callable taking one text and returning a
+                      (category, score) tuple, used for single-text batches.
+            executor: Optional executor to classify batches on; by default
+                      they run on the batcher thread.
+        """
+        self._classify_batch = classify_batch
+        self._classify = classify
+        self._executor = executor
+        self._batch_size = batch_size
+        self._wait = wait_ms / 1000.0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="ClassifyBatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queue a text for classification.
+
+        Args:
+            text: Extracted document text.
+
+        Returns:
+            Future: Resolves to the (category, score) tuple for the text.
+        """
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def close(self):
+        """Classify anything still queued, then stop the batcher thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        """Batcher thread: gather texts until the batch is full or the window ends."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self._wait
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            if self._executor is not None:
+                self._executor.submit(self._flush, batch)
+            else:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        """Classify one batch and resolve its futures."""
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            if len(batch) == 1 and self._classify is not None:
+                results = [self._classify(batch[0][0])]
+            else:
+                results = self._classify_batch([text for text, _ in batch])
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -8,18 +8,71 @@ via cosine similarity.
 Uses a chunked approach: splits document text into overlapping chunks,
 embeds each chunk, and takes the best similarity score across all chunks.
 This produces much better scores than embedding entire documents at once.
+
+Category embeddings are cached on disk (keyed by model name and category
+keywords) so that restarts skip re-encoding unchanged categories. Chunk
+embeddings are memoized by content hash in memory and in an on-disk shelve,
+so re-scanned or retried documents skip the transformer forward pass.
+
+On CPU the model runs through ONNX Runtime when it is installed (see
+src/onnx_encoder.py), falling back to the PyTorch SentenceTransformer.
+
+For large taxonomies (FAISS_MIN_CATEGORIES and up) chunk-to-category
+search goes through a FAISS inner-product index when faiss is installed,
+switching to an approximate HNSW index past FAISS_HNSW_MIN_CATEGORIES.
 """
 
+import glob
+import hashlib
+import logging
+import os
+import re
+import shelve
+import threading
+
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the chunker falls back to plain Python
+    njit = None
+
+try:
+    import faiss
+except ImportError:  # faiss is optional; category search falls back to a numpy matmul
+    faiss = None
+
+from src.config import CACHE_DIR, EMBEDDING_CACHE_PATH
 from src.logger import get_logger
+from src.onnx_encoder import load_onnx_encoder, onnx_backend_available
 
 # Chunk configuration
 CHUNK_SIZE_WORDS = 200       # Words per chunk
 CHUNK_OVERLAP_WORDS = 50     # Overlap between consecutive chunks
 MAX_CHUNKS = 20              # Maximum chunks to process per document
+EARLY_EXIT_BATCH = 4         # Chunks embedded per step before checking for early exit
+EARLY_EXIT_THRESH = 0.70     # Stop embedding chunks once a category scores this high
+
+# Chunk embedding cache configuration
+EMB_CACHE_MAX_ENTRIES = 4096         # In-memory entries kept before FIFO eviction
+EMB_DISK_CACHE_MAX_ENTRIES = 20000   # On-disk entries (~1.6 KB each) before the shelve is reset
+
+# Category index configuration
+FAISS_MIN_CATEGORIES = 1000       # Use a FAISS index from this many categories up
+FAISS_HNSW_MIN_CATEGORIES = 2000  # Switch from exact to HNSW search above this count
+FAISS_HNSW_NEIGHBORS = 32         # HNSW graph degree (M)
+
+# Model warm-up configuration
+WARMUP_BATCH_SIZE = 8        # Sentences encoded at startup to trigger lazy init
+
+_WORD_RE = re.compile(r'\S+')
+
+# Filename fast path configuration
+FILENAME_MIN_TOKEN_HITS = 2  # Distinct keyword tokens a filename must share with one category
+_FILENAME_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_FILENAME_STOPWORDS = frozenset({'a', 'an', 'and', 'in', 'of', 'on', 'the', 'to', 'for', 'with'})
 
 
 class ClassificationEngine:
@@ -30,33 +83,290 @@ class ClassificationEngine:
     Thread-safe for concurrent inference.
     """
 
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    # Encode batch sizes that maximize MiniLM throughput per device type
+    SBERT_OPTIMAL_BATCH_SIZE = {'cpu': 64, 'cuda': 256, 'mps': 256}
+
+    def __init__(self, model_name='all-MiniLM-L6-v2', device=None, compile_model=False,
+                 lazy_load=False, use_onnx=True, onnx_int8=False):
         """Initialize the classification engine.
         
+        On CPU, uses the ONNX Runtime encoder when available. Otherwise
+        loads the SentenceTransformer onto the target device (fp16 weights
+        on CUDA), optionally compiled with torch.compile. Either way a
+        warm-up encode runs so the first real document doesn't pay
+        lazy-init costs.
+        
         Args:
             model_name: Name of the sentence-transformers model to load.
+            device: Torch device to run on. Defaults to 'cuda' when
+                    available, otherwise 'cpu'.
+            compile_model: If True, compile the transformer with torch.compile.
+            lazy_load: If True, defer loading the model until the first
+                       encode. With cached category embeddings, startup then
+                       completes without touching the model at all.
+            use_onnx: If False, always use the PyTorch SentenceTransformer.
+            onnx_int8: If True, run the ONNX backend on a dynamically
+                       int8-quantized model.
         """
         self.logger = get_logger()
-        self.logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
-        self.logger.info("Embedding model loaded successfully")
+        self.model_name = model_name
+        self.compile_model = compile_model
+        self.onnx_int8 = onnx_int8
+        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        self.batch_size = self.SBERT_OPTIMAL_BATCH_SIZE.get(self.device.split(':')[0], 64)
+        
+        # Expected backend; used in cache keys before the model is loaded
+        use_onnx = use_onnx and self.device == 'cpu' and onnx_backend_available(model_name, onnx_int8)
+        if use_onnx:
+            self.backend = 'onnx-int8' if onnx_int8 else 'onnx'
+        else:
+            self.backend = 'torch'
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._categories_dict = None  # Last precomputed categories, re-encoded if the backend changes
+        if not lazy_load:
+            self._load_model()
         
         self.category_names = []
         self.category_embeddings = None
+        self.categories_key = None  # Identifies the current model + categories, set by precompute_categories()
+        self._cat_norm_T = None  # L2-normalized category embeddings, shape (dim, n_categories)
+        self._faiss_index = None  # Inner-product index over category embeddings (large taxonomies)
+        self._filename_keywords = {}  # keyword token -> category, unambiguous tokens only
+        
+        self._emb_cache = {}  # chunk hash -> embedding, insertion-ordered for FIFO eviction
+        self._emb_cache_lock = threading.Lock()
+        self._emb_db = None  # On-disk shelve, opened on first use and kept open until close()
+        self._emb_db_count = 0  # Entries in the shelve
+        self._emb_db_failed = False  # Set if the shelve can't be opened; disk caching is skipped
+        self._emb_db_lock = threading.Lock()  # Guards the shelve, separately from the memory cache
+
+    @property
+    def model(self):
+        """The embedding model, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._load_model()
+        return self._model
+
+    def _load_model(self):
+        """Load the embedding model for the configured device and warm it up.
+        
+        If the expected ONNX backend turns out to be unavailable, categories
+        precomputed under it (lazy loading) are encoded again, so their
+        cache key and the result-cache namespace name the real backend.
+        """
+        self.logger.info(f"Loading embedding model: {self.model_name} (device={self.device})")
+        expected_backend = self.backend
+        
+        model = load_onnx_encoder(self.model_name, quantize=self.onnx_int8) if self.backend != 'torch' else None
+        if model is not None:
+            self._model = model
+            self._warm_up()
+        else:
+            self.backend = 'torch'
+            model = SentenceTransformer(self.model_name, device=self.device)
+            if self.device.startswith('cuda'):
+                model.half()
+            self._model = model
+            if self.compile_model:
+                self._compile_model()
+            else:
+                self._warm_up()
+        self.logger.info(f"Embedding model loaded successfully (backend={self.backend})")
+        if self.backend != expected_backend and self._categories_dict is not None:
+            self.logger.info(f"Backend changed from {expected_backend}; re-encoding categories")
+            self.precompute_categories(self._categories_dict)
+
+    def _warm_up(self):
+        """Run a throwaway encode to trigger lazy initialization."""
+        self._model.encode(
+            ["warmup"] * WARMUP_BATCH_SIZE,
+            batch_size=WARMUP_BATCH_SIZE,
+            show_progress_bar=False,
+        )
+
+    def _compile_model(self):
+        """Compile the underlying transformer with torch.compile.
+        
+        Compilation happens lazily on the first forward pass, so the warm-up
+        runs here too. Falls back to the eager model if compilation fails.
+        """
+        module = self._model._first_module()
+        eager_model = module.auto_model
+        try:
+            module.auto_model = torch.compile(eager_model, mode='reduce-overhead')
+            self._warm_up()
+            self.logger.info("Embedding model compiled with torch.compile")
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed, using eager model: {e}")
+            module.auto_model = eager_model
+            self._warm_up()
 
     def precompute_categories(self, categories_dict):
         """Precompute embeddings for all category keyword strings.
         
+        Embeddings are loaded from the on-disk cache when the model and
+        category keywords are unchanged since the last run; otherwise they
+        are encoded and written back to the cache.
+        
         Args:
             categories_dict: Dict mapping category name -> keyword description string.
                              e.g. {"RL": "Reinforcement Learning, Q-learning, ..."}
         """
+        self._categories_dict = categories_dict
         self.category_names = list(categories_dict.keys())
         keyword_strings = list(categories_dict.values())
         
-        self.logger.info(f"Precomputing embeddings for {len(self.category_names)} categories: {self.category_names}")
-        self.category_embeddings = self.model.encode(keyword_strings, convert_to_numpy=True)
-        self.logger.info("Category embeddings precomputed successfully")
+        cache_key = self._category_cache_key(categories_dict)
+        self.categories_key = cache_key
+        self.invalidate_if_categories_changed(cache_key)
+        cache_path = os.path.join(CACHE_DIR, f'cats_{cache_key}.npz')
+        
+        embeddings = self._load_cached_categories(cache_path)
+        if embeddings is None:
+            model = self.model
+            if self.categories_key != cache_key:
+                return  # Loading the model changed the backend and already re-encoded
+            self.logger.info(f"Precomputing embeddings for {len(self.category_names)} categories: {self.category_names}")
+            embeddings = model.encode(keyword_strings, convert_to_numpy=True)
+            self._save_cached_categories(cache_path, embeddings)
+            self.logger.info("Category embeddings precomputed successfully")
+        else:
+            self.logger.info(f"Loaded cached embeddings for {len(self.category_names)} categories: {self.category_names}")
+        
+        embeddings = embeddings.astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.category_embeddings = embeddings
+        self._cat_norm_T = np.ascontiguousarray(embeddings.T)
+        
+        self._faiss_index = self._build_faiss_index(embeddings)
+        self._filename_keywords = self._build_filename_keywords(categories_dict)
+
+    def _build_filename_keywords(self, categories_dict):
+        """Map keyword tokens to categories for the filename fast path.
+        
+        Tokens come from each category's name and keyword string. Tokens
+        shared by several categories (e.g. "gradient") are dropped, since
+        they can't identify a single category.
+        
+        Args:
+            categories_dict: Dict mapping category name -> keyword description string.
+            
+        Returns:
+            dict: Mapping of lowercase token -> category name.
+        """
+        owners = {}
+        for category, keywords in categories_dict.items():
+            for token in _filename_tokens(f"{category} {keywords}"):
+                owners.setdefault(token, set()).add(category)
+        return {token: cats.pop() for token, cats in owners.items() if len(cats) == 1}
+
+    def classify_filename(self, filename):
+        """Classify a file from its name alone, without running the model.
+        
+        The filename stem is split into lowercase tokens and matched against
+        the category keyword tokens. Only a clear match counts: exactly one
+        category must share at least FILENAME_MIN_TOKEN_HITS distinct tokens
+        with the filename.
+        
+        Args:
+            filename: File name (with or without directory and extension).
+            
+        Returns:
+            str or None: The matched category name, or None if ambiguous.
+        """
+        if not self._filename_keywords:
+            return None
+        
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        hits = {}
+        for token in _filename_tokens(stem):
+            category = self._filename_keywords.get(token)
+            if category is not None:
+                hits[category] = hits.get(category, 0) + 1
+        
+        matches = [category for category, count in hits.items() if count >= FILENAME_MIN_TOKEN_HITS]
+        if len(matches) != 1:
+            return None
+        return matches[0]
+
+    def _build_faiss_index(self, embeddings):
+        """Build a FAISS index over normalized category embeddings.
+        
+        Only used for large taxonomies, where the full chunk x category
+        matmul dominates classification time.
+        
+        Args:
+            embeddings: L2-normalized float32 array of shape (n_categories, dim).
+            
+        Returns:
+            faiss.Index or None: The index, or None if faiss is unavailable
+            or there are too few categories to benefit.
+        """
+        n_categories, dim = embeddings.shape
+        if faiss is None or n_categories < FAISS_MIN_CATEGORIES:
+            return None
+        
+        if n_categories > FAISS_HNSW_MIN_CATEGORIES:
+            index = faiss.IndexHNSWFlat(dim, FAISS_HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+        self.logger.info(f"Built FAISS {type(index).__name__} over {n_categories} categories")
+        return index
+
+    def invalidate_if_categories_changed(self, cache_key):
+        """Delete cached category embeddings that don't match the current key.
+        
+        Args:
+            cache_key: Cache key for the current model and categories.
+        """
+        for path in glob.glob(os.path.join(CACHE_DIR, 'cats_*.npz')):
+            if os.path.basename(path) != f'cats_{cache_key}.npz':
+                try:
+                    os.remove(path)
+                    self.logger.info(f"Removed stale category embedding cache: {os.path.basename(path)}")
+                except OSError as e:
+                    self.logger.warning(f"Could not remove stale cache {path}: {e}")
+
+    def _category_cache_key(self, categories_dict):
+        """Build a stable cache key from the model name and category keywords."""
+        entries = sorted(f"{name}={keywords}" for name, keywords in categories_dict.items())
+        payload = "|".join(entries) + self.model_name + self.backend
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _load_cached_categories(self, cache_path):
+        """Load cached category embeddings, reordered to match category_names.
+        
+        Embeddings written by a different backend than the current one are
+        treated as a miss.
+        
+        Returns:
+            np.ndarray or None: Embedding matrix, or None on cache miss.
+        """
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as data:
+                if str(data['backend']) != self.backend:
+                    return None
+                embeddings = data['emb']
+                names = [str(n) for n in data['names']]
+            order = [names.index(name) for name in self.category_names]
+            return embeddings[order]
+        except (OSError, KeyError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable category embedding cache: {e}")
+            return None
+
+    def _save_cached_categories(self, cache_path, embeddings):
+        """Persist category embeddings and their names to the on-disk cache."""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            np.savez(cache_path, emb=embeddings, names=np.array(self.category_names), backend=np.array(self.backend))
+        except OSError as e:
+            self.logger.warning(f"Could not write category embedding cache: {e}")
 
     def classify(self, text):
         """Classify a document's text against all categories.
@@ -66,6 +376,9 @@ class ClassificationEngine:
         (category, score) across all chunks. This chunked approach produces
         much higher similarity scores than embedding entire documents.
         
+        Chunks are embedded a few at a time; once any category reaches
+        EARLY_EXIT_THRESH the remaining chunks are skipped.
+        
         Args:
             text: Extracted document text string.
             
@@ -78,7 +391,7 @@ class ClassificationEngine:
             self.logger.warning("No categories loaded — cannot classify")
             return ("UNKNOWN", 0.0)
         
-        if not text or not text.strip():
+        if not text or text.isspace():
             self.logger.warning("Empty text provided for classification")
             return ("UNKNOWN", 0.0)
 
@@ -89,54 +402,354 @@ class ClassificationEngine:
             self.logger.warning("No chunks produced from text")
             return ("UNKNOWN", 0.0)
         
-        self.logger.debug(f"Processing {len(chunks)} text chunks")
+        self.logger.debug(f"Processing up to {len(chunks)} text chunks")
         
-        # Encode all chunks in one batch for efficiency
-        chunk_embeddings = self.model.encode(chunks, convert_to_numpy=True, batch_size=len(chunks))
-        
-        # Compute similarity of each chunk against all categories
-        # Result shape: (num_chunks, num_categories)
-        all_similarities = cosine_similarity(chunk_embeddings, self.category_embeddings)
+        # For each category, track the max score across processed chunks
+        max_scores_per_category = None
+        processed = 0
+        for start in range(0, len(chunks), EARLY_EXIT_BATCH):
+            batch = chunks[start:start + EARLY_EXIT_BATCH]
+            chunk_embeddings = self._get_or_embed(batch).astype(np.float32, copy=False)
+            
+            batch_max = self._max_scores(chunk_embeddings)
+            if max_scores_per_category is None:
+                max_scores_per_category = batch_max
+            else:
+                max_scores_per_category = np.maximum(max_scores_per_category, batch_max)
+            processed += len(batch)
+            
+            if np.max(max_scores_per_category) >= EARLY_EXIT_THRESH:
+                break
         
-        # For each category, take the max score across all chunks
-        max_scores_per_category = np.max(all_similarities, axis=0)
+        if processed < len(chunks):
+            self.logger.debug(f"Early exit after {processed}/{len(chunks)} chunks")
         
         # Find best category
         best_idx = int(np.argmax(max_scores_per_category))
         best_category = self.category_names[best_idx]
         best_score = float(max_scores_per_category[best_idx])
         
-        self.logger.debug(
-            f"Classification scores (max across chunks): "
-            f"{dict(zip(self.category_names, [f'{s:.4f}' for s in max_scores_per_category]))}"
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                f"Classification scores (max across chunks): "
+                f"{dict(zip(self.category_names, [f'{s:.4f}' for s in max_scores_per_category]))}"
+            )
         
         return (best_category, best_score)
 
+    def classify_batch(self, texts):
+        """Classify several documents with shared embedding passes.
+        
+        Chunks are embedded in rounds of EARLY_EXIT_BATCH per document:
+        each round concatenates the next chunks of every document still in
+        play, embeds them in one encode call, scores them against all
+        categories in one matmul, and reduces back per document by offset
+        without a Python loop over chunks. As in classify(), a document
+        drops out once any category reaches EARLY_EXIT_THRESH, so its
+        remaining chunks are never embedded. This amortizes per-call encode
+        overhead when many files are processed at once (e.g. the startup
+        scan).
+        
+        Args:
+            texts: List of extracted document text strings.
+            
+        Returns:
+            list: One (category_name, similarity_score) tuple per input text,
+                  in input order. Empty texts yield ("UNKNOWN", 0.0).
+        """
+        results = [("UNKNOWN", 0.0)] * len(texts)
+        if self.category_embeddings is None or len(self.category_names) == 0:
+            self.logger.warning("No categories loaded — cannot classify")
+            return results
+        
+        doc_indices = []  # Input position of each non-empty document
+        doc_chunks = []   # Chunks of each non-empty document
+        for doc_idx, text in enumerate(texts):
+            if not text or text.isspace():
+                continue
+            chunks = self._split_into_chunks(text)
+            if chunks:
+                doc_indices.append(doc_idx)
+                doc_chunks.append(chunks)
+        
+        if not doc_chunks:
+            return results
+        
+        self.logger.debug(f"Batch classifying {len(doc_indices)} documents")
+        
+        best_score = np.full(len(doc_chunks), -np.inf, dtype=np.float32)
+        best_cat = np.zeros(len(doc_chunks), dtype=np.int64)
+        active = list(range(len(doc_chunks)))  # Documents still embedding chunks
+        start = 0
+        while active:
+            round_docs = []
+            round_starts = []  # Offset of each document's chunks in round_chunks
+            round_chunks = []
+            for doc in active:
+                piece = doc_chunks[doc][start:start + EARLY_EXIT_BATCH]
+                if piece:
+                    round_docs.append(doc)
+                    round_starts.append(len(round_chunks))
+                    round_chunks.extend(piece)
+            if not round_chunks:
+                break
+            
+            chunk_embeddings = self._get_or_embed(round_chunks).astype(np.float32, copy=False)
+            
+            # Best category and score for every chunk
+            chunk_idx, chunk_scores = self._best_per_chunk(chunk_embeddings)
+            
+            # Per-document max over its contiguous chunk segment, then the
+            # first chunk in each segment that reaches that max
+            starts = np.asarray(round_starts)
+            seg_max = np.maximum.reduceat(chunk_scores, starts)
+            lengths = np.diff(np.append(starts, len(chunk_scores)))
+            hits = np.flatnonzero(chunk_scores == np.repeat(seg_max, lengths))
+            top_chunks = hits[np.searchsorted(hits, starts)]
+            
+            # Earlier chunks win ties, as in classify()
+            docs = np.asarray(round_docs)
+            improved = seg_max > best_score[docs]
+            best_score[docs[improved]] = seg_max[improved]
+            best_cat[docs[improved]] = chunk_idx[top_chunks[improved]]
+            
+            start += EARLY_EXIT_BATCH
+            active = [doc for doc in round_docs if best_score[doc] < EARLY_EXIT_THRESH]
+        
+        names = self.category_names
+        for doc_idx, cat_idx, score in zip(doc_indices, best_cat.tolist(), best_score.tolist()):
+            results[doc_idx] = (names[cat_idx], score)
+        
+        return results
+
+    def _max_scores(self, chunk_embeddings):
+        """Compute each category's best similarity over a set of chunks.
+        
+        With a FAISS index only each chunk's top-1 category is searched;
+        categories that are never a top-1 hit are reported as -inf.
+        
+        Args:
+            chunk_embeddings: Normalized float32 array of shape (num_chunks, dim).
+            
+        Returns:
+            np.ndarray: Array of shape (num_categories,).
+        """
+        if self._faiss_index is not None:
+            best_idx, best_scores = self._best_per_chunk(chunk_embeddings)
+            max_scores = np.full(len(self.category_names), -np.inf, dtype=np.float32)
+            np.maximum.at(max_scores, best_idx, best_scores)
+            return max_scores
+        # Result shape: (num_chunks, num_categories)
+        return np.max(self._similarities(chunk_embeddings), axis=0)
+
+    def _best_per_chunk(self, chunk_embeddings):
+        """Find the top-1 category for each chunk.
+        
+        Args:
+            chunk_embeddings: Normalized float32 array of shape (num_chunks, dim).
+            
+        Returns:
+            tuple: (indices, scores) arrays of shape (num_chunks,).
+        """
+        if self._faiss_index is not None:
+            scores, indices = self._faiss_index.search(
+                np.ascontiguousarray(chunk_embeddings, dtype=np.float32), 1
+            )
+            return indices[:, 0], scores[:, 0]
+        similarities = self._similarities(chunk_embeddings)
+        indices = np.argmax(similarities, axis=1)
+        return indices, similarities[np.arange(len(indices)), indices]
+
+    def _similarities(self, chunk_embeddings):
+        """Compute cosine similarity of each chunk against every category.
+        
+        Both sides are L2-normalized, so cosine similarity is a single matmul.
+        
+        Args:
+            chunk_embeddings: Normalized float32 array of shape (num_chunks, dim).
+            
+        Returns:
+            np.ndarray: Similarities of shape (num_chunks, num_categories).
+        """
+        return chunk_embeddings @ self._cat_norm_T
+
+    def _get_or_embed(self, chunks):
+        """Embed chunks, reusing memoized embeddings for previously seen text.
+        
+        Looks each chunk up by content hash in the in-memory cache, then in
+        the on-disk shelve. Only the misses are sent through the model, and
+        their embeddings are written back to both caches.
+        
+        Args:
+            chunks: List of text chunks.
+            
+        Returns:
+            np.ndarray: Embedding matrix with one row per chunk, in input order.
+        """
+        backend = self.backend
+        namespace = f"{self.model_name}|{backend}|".encode('utf-8')
+        keys = [hashlib.blake2b(namespace + c.encode('utf-8'), digest_size=16).hexdigest() for c in chunks]
+        found = {}
+        
+        with self._emb_cache_lock:
+            for key in keys:
+                if key in self._emb_cache:
+                    found[key] = self._emb_cache[key]
+            missing = [k for k in set(keys) if k not in found]
+        if missing:
+            with self._emb_db_lock:
+                db = self._open_emb_db()
+                if db is not None:
+                    try:
+                        for key in missing:
+                            if key in db:
+                                found[key] = db[key]
+                    except Exception as e:
+                        self.logger.warning(f"Could not read embedding cache: {e}")
+        
+        miss_chunks = {}
+        for key, chunk in zip(keys, chunks):
+            if key not in found and key not in miss_chunks:
+                miss_chunks[key] = chunk
+        
+        if miss_chunks:
+            miss_keys = list(miss_chunks)
+            embeddings = self.model.encode(
+                list(miss_chunks.values()),
+                convert_to_numpy=True,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+            for key, embedding in zip(miss_keys, embeddings):
+                found[key] = embedding
+        
+        self.logger.debug(f"Embedding cache: {len(keys) - len(miss_chunks)} hits, {len(miss_chunks)} misses")
+        
+        cache_keys = keys
+        if self.backend != backend:
+            # Loading the model for the misses fell back to another backend;
+            # their embeddings don't belong under these keys
+            cache_keys = [key for key in keys if key not in miss_chunks]
+            miss_chunks = {}
+        
+        with self._emb_cache_lock:
+            for key in cache_keys:
+                if key not in self._emb_cache:
+                    self._emb_cache[key] = found[key]
+            while len(self._emb_cache) > EMB_CACHE_MAX_ENTRIES:
+                del self._emb_cache[next(iter(self._emb_cache))]
+        if miss_chunks:
+            with self._emb_db_lock:
+                db = self._open_emb_db()
+                if db is not None:
+                    try:
+                        if self._emb_db_count + len(miss_chunks) > EMB_DISK_CACHE_MAX_ENTRIES:
+                            db = self._open_emb_db(reset=True)
+                        for key in miss_chunks:
+                            db[key] = found[key]
+                        self._emb_db_count += len(miss_chunks)
+                    except Exception as e:
+                        self.logger.warning(f"Could not write embedding cache: {e}")
+        
+        return np.stack([found[key] for key in keys])
+
+    def _open_emb_db(self, reset=False):
+        """Return the on-disk embedding shelve, opening it on first use.
+        
+        Caller must hold _emb_db_lock. The shelve has no eviction order, so
+        once it would exceed EMB_DISK_CACHE_MAX_ENTRIES it is recreated empty.
+        
+        Args:
+            reset: If True, discard every entry and start a new shelve.
+            
+        Returns:
+            shelve.Shelf or None: The shelve, or None if it can't be opened.
+        """
+        if self._emb_db_failed:
+            return None
+        if reset and self._emb_db is not None:
+            self._emb_db.close()
+            self._emb_db = None
+            self.logger.info(f"Embedding cache reached {self._emb_db_count} entries; starting a new one")
+        if self._emb_db is None:
+            try:
+                os.makedirs(os.path.dirname(EMBEDDING_CACHE_PATH), exist_ok=True)
+                self._emb_db = shelve.open(EMBEDDING_CACHE_PATH, flag='n' if reset else 'c')
+                self._emb_db_count = len(self._emb_db)
+            except Exception as e:
+                self.logger.warning(f"Could not open embedding cache, using memory only: {e}")
+                self._emb_db_failed = True
+                return None
+        return self._emb_db
+
+    def close(self):
+        """Close the on-disk embedding cache. Call once at shutdown."""
+        with self._emb_db_lock:
+            if self._emb_db is not None:
+                self._emb_db.close()
+                self._emb_db = None
+
     def _split_into_chunks(self, text):
         """Split text into overlapping word-level chunks.
         
+        Word boundaries are located once as character offsets; chunk
+        windows are computed over those offsets and each chunk is a single
+        slice of the original text.
+        
         Args:
             text: Full document text.
             
         Returns:
             list[str]: List of text chunks.
         """
-        words = text.split()
+        spans = np.array([m.span() for m in _WORD_RE.finditer(text)], dtype=np.int64).reshape(-1, 2)
         
         # If text is short enough, just return it as a single chunk
-        if len(words) <= CHUNK_SIZE_WORDS:
+        if len(spans) <= CHUNK_SIZE_WORDS:
             return [text]
         
-        chunks = []
-        step = CHUNK_SIZE_WORDS - CHUNK_OVERLAP_WORDS
-        
-        for i in range(0, len(words), step):
-            chunk_words = words[i:i + CHUNK_SIZE_WORDS]
-            chunk = " ".join(chunk_words)
-            chunks.append(chunk)
-            
-            if len(chunks) >= MAX_CHUNKS:
-                break
+        starts, ends = _chunk_bounds(
+            np.ascontiguousarray(spans[:, 0]),
+            np.ascontiguousarray(spans[:, 1]),
+            CHUNK_SIZE_WORDS,
+            CHUNK_OVERLAP_WORDS,
+            MAX_CHUNKS,
+        )
+        return [text[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def _filename_tokens(text):
+    """Split text into the set of lowercase alphanumeric tokens, minus stopwords."""
+    tokens = {token for token in _FILENAME_TOKEN_RE.findall(text.lower()) if len(token) > 1}
+    return tokens - _FILENAME_STOPWORDS
+
+
+def _chunk_bounds(word_starts, word_ends, chunk_size, overlap, max_chunks):
+    """Compute (start, end) character offsets of overlapping word windows.
+    
+    Args:
+        word_starts: int64 array of word start offsets.
+        word_ends: int64 array of word end offsets.
+        chunk_size: Words per chunk.
+        overlap: Words shared by consecutive chunks.
+        max_chunks: Maximum number of chunks to emit.
         
-        return chunks
+    Returns:
+        tuple: (chunk_starts, chunk_ends) int64 arrays.
+    """
+    n = word_starts.shape[0]
+    step = chunk_size - overlap
+    count = min((n + step - 1) // step, max_chunks)
+    chunk_starts = np.empty(count, dtype=np.int64)
+    chunk_ends = np.empty(count, dtype=np.int64)
+    for i in range(count):
+        first = i * step
+        last = min(first + chunk_size, n) - 1
+        chunk_starts[i] = word_starts[first]
+        chunk_ends[i] = word_ends[last]
+    return chunk_starts, chunk_ends
+
+
+if njit is not None:
+    _chunk_bounds = njit(cache=True)(_chunk_bounds)
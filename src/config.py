@@ -8,6 +8,7 @@ Resolves all paths dynamically based on the current user's home directory.
 import json
 import os
 import sys
+from functools import lru_cache
 
 
 def _get_base_dir():
@@ -30,12 +31,27 @@ DATA_DIR = APP_DATA_DIR
 
 # Processed files registry path
 PROCESSED_FILES_PATH = os.path.join(DATA_DIR, 'processed_files.json')
+# Append-only log of registry updates since the last snapshot
+PROCESSED_LOG_PATH = PROCESSED_FILES_PATH + '.log'
 
-# These are resolved at runtime from config.json via get_source_dir() / get_destination_dir()
+# On-disk cache for derived data (e.g. precomputed embeddings)
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+EMBEDDING_CACHE_PATH = os.path.join(DATA_DIR, 'emb_cache', 'chunks.db')
+MODELS_DIR = os.path.join(DATA_DIR, 'models')
+RESULT_CACHE_PATH = os.path.join(CACHE_DIR, 'results.sqlite')
+
+# These are resolved at runtime from config.json via get_config()
 _config_cache = None
 
-def _get_config_cached():
-    """Load config once and cache it."""
+def get_config():
+    """Get the runtime configuration, loading config.json only once.
+    
+    Returns the config most recently loaded via load_config() (including a
+    custom --config path), so hot paths don't re-read the file.
+    
+    Returns:
+        dict: Configuration dictionary with all runtime settings.
+    """
     global _config_cache
     if _config_cache is None:
         _config_cache = load_config()
@@ -43,12 +59,12 @@ def _get_config_cached():
 
 def get_source_dir():
     """Get the source directory (Downloads) from config, with fallback."""
-    config = _get_config_cached()
+    config = get_config()
     return config.get('source_dir', os.path.join(USER_HOME, 'Downloads'))
 
 def get_destination_dir():
     """Get the destination directory (Subjects) from config, with fallback."""
-    config = _get_config_cached()
+    config = get_config()
     return config.get('destination_dir', os.path.join(USER_HOME, 'Desktop', 'Subjects'))
 
 # Supported file extensions grouped by type
@@ -103,20 +119,39 @@ def get_file_type(filepath):
     Returns:
         str or None: 'documents', 'images', or 'code', or None if unsupported.
     """
-    ext = os.path.splitext(filepath)[1].lower()
+    return file_type_for_ext(os.path.splitext(filepath)[1].lower())
+
+
+@lru_cache(maxsize=256)
+def file_type_for_ext(ext):
+    """Look up the file type group for a lowercase extension (memoized).
+    
+    Args:
+        ext: Extension including the dot, e.g. '.pdf'.
+        
+    Returns:
+        str or None: 'documents', 'images', or 'code', or None if unsupported.
+    """
     for file_type, extensions in SUPPORTED_EXTENSIONS.items():
         if ext in extensions:
             return file_type
     return None
 
 
-def ensure_directories():
+def ensure_directories(categories=None):
     """Create all required directories if they don't exist.
     
     Creates:
         - Destination directory for subjects
+        - One subfolder per category, if categories are given
         - AppData directory for logs and data
         - Log directory
+    
+    Args:
+        categories: Optional dict of category name -> keywords.
     """
-    for directory in [get_destination_dir(), APP_DATA_DIR, LOG_DIR]:
+    destination_dir = get_destination_dir()
+    for directory in [destination_dir, APP_DATA_DIR, LOG_DIR]:
         os.makedirs(directory, exist_ok=True)
+    for category in categories or ():
+        os.makedirs(os.path.join(destination_dir, category), exist_ok=True)
@@ -0,0 +1,107 @@
+"""
+Local control socket for AutoSorter.
+
+When started with --ipc-socket PATH, the app listens on a Unix domain
+socket for JSON commands, so a tool such as the stress test can point a
+running instance at new folders instead of restarting it (and loading
+the embedding model again). Each connection sends one request line and
+reads back one reply line:
+
+    {"cmd": "reset", "config": "/path/to/config.json"}  ->  {"ok": true}
+
+Unknown commands and failed handlers are answered with
+{"ok": false, "error": "..."}. Commands run one at a time on the server
+thread. Platforms without Unix domain sockets cannot start the server.
+"""
+
+import json
+import os
+import socket
+import threading
+
+from src.logger import get_logger
+
+# How often the accept loop checks whether it should stop
+ACCEPT_POLL_SECONDS = 0.5
+
+
+class ControlServer:
+    """Serves one-line JSON commands on a Unix domain socket."""
+
+    def __init__(self, socket_path, handlers):
+        """Configure the server. Nothing is bound until start().
+
+        Args:
+            socket_path: Filesystem path for the socket; a stale file there
+                         is replaced.
+            handlers: Mapping of command name -> callable taking the request
+                      dict and returning a dict of extra reply fields (or None).
+        """
+        self.socket_path = socket_path
+        self.handlers = handlers
+        self.logger = get_logger()
+        self._sock = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Bind the socket and start serving on a background thread.
+
+        Raises:
+            OSError: If Unix domain sockets are unavailable or binding fails.
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("Unix domain sockets are not supported on this platform")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        self._sock.listen(1)
+        self._sock.settimeout(ACCEPT_POLL_SECONDS)
+        self._thread = threading.Thread(target=self._serve, name="ControlServer", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Control socket listening on: {self.socket_path}")
+
+    def stop(self):
+        """Stop serving and remove the socket file."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _serve(self):
+        """Server thread: accept connections and answer one command each."""
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return  # Socket closed
+            with conn:
+                conn.settimeout(None)
+                self._handle(conn)
+
+    def _handle(self, conn):
+        """Read one request line from a connection and write the reply."""
+        try:
+            with conn.makefile('rb') as reader:
+                request = json.loads(reader.readline())
+            handler = self.handlers.get(request.get('cmd'))
+            if handler is None:
+                raise ValueError(f"unknown command: {request.get('cmd')!r}")
+            reply = {'ok': True}
+            reply.update(handler(request) or {})
+        except Exception as e:
+            self.logger.error(f"Control command failed: {e}")
+            reply = {'ok': False, 'error': str(e)}
+        try:
+            conn.sendall(json.dumps(reply).encode('utf-8') + b'\n')
+        except OSError:
+            pass  # Client went away
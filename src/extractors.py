@@ -4,61 +4,118 @@ Text extraction layer for AutoSorter.
 Provides unified extract_text(filepath) dispatcher that routes to the
 appropriate extractor based on file extension. Each extractor is wrapped
 in try/except to gracefully handle corrupt or unreadable files.
+
+Third-party parsers are imported once at module load. A missing optional
+dependency disables only the extractors that need it.
 """
 
+import errno
+import io
 import json
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-from src.config import get_file_type, SUPPORTED_EXTENSIONS, load_config
+from src.config import get_file_type, SUPPORTED_EXTENSIONS, get_config
 from src.logger import get_logger
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
+try:
+    from pptx import Presentation
+except ImportError:
+    Presentation = None
+
+try:
+    import pytesseract
+    from PIL import Image, ImageOps
+except ImportError:
+    pytesseract = None
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Tesseract flags: LSTM engine only, assume a single uniform block of text
+TESSERACT_CONFIG = '--oem 1 --psm 6'
+
+# Notebooks at least this large are streamed instead of parsed whole
+NOTEBOOK_STREAM_THRESHOLD_BYTES = 8 * 1024 * 1024
+
 
 def extract_text(filepath):
     """Extract text content from a file.
     
     Routes to the appropriate extractor based on file extension.
-    Returns empty string on any extraction failure.
+    Returns empty string on any extraction failure, except that a file
+    which no longer exists is reported to the caller.
     
     Args:
         filepath: Absolute path to the file.
         
     Returns:
         str: Extracted text content, or empty string on failure.
+        
+    Raises:
+        FileNotFoundError: If the file was moved or deleted.
     """
     logger = get_logger()
     ext = os.path.splitext(filepath)[1].lower()
     
+    extractor = _DISPATCH.get(ext)
+    if extractor is None:
+        logger.warning(f"No extractor for extension: {ext}")
+        return ""
+    
     try:
-        if ext == '.pdf':
-            return _extract_pdf(filepath)
-        elif ext == '.docx':
-            return _extract_docx(filepath)
-        elif ext == '.pptx':
-            return _extract_pptx(filepath)
-        elif ext in {'.jpg', '.jpeg', '.png'}:
-            return _extract_image(filepath)
-        elif ext == '.ipynb':
-            return _extract_notebook(filepath)
-        elif ext in {'.py', '.c', '.lex'}:
-            return _extract_code(filepath)
-        else:
-            logger.warning(f"No extractor for extension: {ext}")
-            return ""
+        return extractor(filepath)
+    except FileNotFoundError:
+        raise
     except Exception as e:
+        # Document libraries wrap a missing file in their own error types;
+        # the existence check only runs on this failure path
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), filepath) from e
         logger.error(f"Extraction failed for {os.path.basename(filepath)}: {e}")
         return ""
 
 
+def _require(module, package):
+    """Raise ImportError if an optional extractor dependency is missing."""
+    if module is None:
+        raise ImportError(f"{package} is not installed")
+
+
 def _extract_pdf(filepath):
     """Extract text from a PDF file.
     
     Attempts direct text extraction first. If result is empty or very short,
     falls back to OCR on page images. Limited to first N pages (from config).
     """
-    import fitz  # PyMuPDF
+    _require(fitz, 'PyMuPDF')
     
     logger = get_logger()
-    config = load_config()
+    config = get_config()
     max_pages = config.get('ocr_max_pages', 5)
     
     doc = fitz.open(filepath)
@@ -82,39 +139,54 @@ def _extract_pdf(filepath):
 
 
 def _ocr_pdf_pages(doc, num_pages):
-    """OCR fallback for PDF pages that lack embedded text."""
-    import pytesseract
-    from PIL import Image
-    import io
+    """OCR fallback for PDF pages that lack embedded text.
     
-    text_parts = []
+    Pages are rendered in the calling thread (PyMuPDF documents are not
+    thread-safe), then OCR'd concurrently. pytesseract runs each page in a
+    separate tesseract process, so threads are enough to use multiple cores.
+    """
+    _require(pytesseract, 'pytesseract/Pillow')
+    
+    images = []
     for page_num in range(num_pages):
         page = doc[page_num]
-        # Render page to image at 200 DPI
-        pix = page.get_pixmap(dpi=200)
-        img_data = pix.tobytes("png")
-        img = Image.open(io.BytesIO(img_data))
-        page_text = pytesseract.image_to_string(img)
-        text_parts.append(page_text)
+        # Render page to a grayscale image at 200 DPI and wrap the raw
+        # samples directly, skipping a PNG encode/decode round-trip
+        pix = page.get_pixmap(dpi=200, colorspace=fitz.csGRAY, alpha=False)
+        images.append(Image.frombuffer("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride, 1))
+    
+    if len(images) < 2:
+        text_parts = [_ocr_image(img) for img in images]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(images), os.cpu_count() or 1)) as executor:
+            text_parts = list(executor.map(_ocr_image, images))
     
     return "\n".join(text_parts).strip()
 
 
 def _extract_docx(filepath):
     """Extract full text from a DOCX file."""
-    from docx import Document
+    _require(Document, 'python-docx')
     
     doc = Document(filepath)
-    paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-    return "\n".join(paragraphs)
+    buf = io.StringIO()
+    sep = ''
+    for paragraph in doc.paragraphs:
+        text = paragraph.text
+        if text.strip():
+            buf.write(sep)
+            buf.write(text)
+            sep = '\n'
+    return buf.getvalue()
 
 
 def _extract_pptx(filepath):
     """Extract text from all slides in a PPTX file."""
-    from pptx import Presentation
+    _require(Presentation, 'python-pptx')
     
     prs = Presentation(filepath)
-    text_parts = []
+    buf = io.StringIO()
+    sep = ''
     
     for slide in prs.slides:
         for shape in slide.shapes:
@@ -122,38 +194,54 @@ def _extract_pptx(filepath):
                 for paragraph in shape.text_frame.paragraphs:
                     text = paragraph.text.strip()
                     if text:
-                        text_parts.append(text)
+                        buf.write(sep)
+                        buf.write(text)
+                        sep = '\n'
     
-    return "\n".join(text_parts)
+    return buf.getvalue()
 
 
 def _extract_image(filepath):
     """Extract text from an image using OCR."""
-    import pytesseract
-    from PIL import Image
+    _require(pytesseract, 'pytesseract/Pillow')
     
     img = Image.open(filepath)
-    text = pytesseract.image_to_string(img)
+    text = _ocr_image(img)
     return text.strip()
 
 
+def _ocr_image(img):
+    """Binarize an image and run Tesseract on it.
+    
+    Converts to grayscale and applies a Gaussian adaptive threshold
+    (OpenCV, if installed) so Tesseract gets a clean black-on-white page.
+    Without OpenCV, only the grayscale conversion is applied.
+    """
+    _require(pytesseract, 'pytesseract/Pillow')
+    
+    gray = ImageOps.grayscale(img)
+    if cv2 is not None:
+        binary = cv2.adaptiveThreshold(
+            np.asarray(gray), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+        )
+        gray = Image.fromarray(binary)
+    
+    return pytesseract.image_to_string(gray, config=TESSERACT_CONFIG)
+
+
 def _extract_notebook(filepath):
     """Extract text from a Jupyter notebook (.ipynb).
     
     Reads source content from both code and markdown cells.
     """
-    config = load_config()
+    config = get_config()
     max_lines = config.get('code_max_lines', 500)
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        notebook = json.load(f)
-    
-    text_parts = []
+    buf = io.StringIO()
+    sep = ''
     total_lines = 0
     
-    cells = notebook.get('cells', [])
-    for cell in cells:
-        source = cell.get('source', [])
+    for source in _iter_notebook_sources(filepath):
         if isinstance(source, list):
             lines = source
         else:
@@ -162,28 +250,83 @@ def _extract_notebook(filepath):
         for line in lines:
             if total_lines >= max_lines:
                 break
-            text_parts.append(line.rstrip('\n'))
+            buf.write(sep)
+            buf.write(line.rstrip('\n'))
+            sep = '\n'
             total_lines += 1
         
         if total_lines >= max_lines:
             break
     
-    return "\n".join(text_parts)
+    return buf.getvalue()
+
+
+def _iter_notebook_sources(filepath):
+    """Yield the source of each notebook cell.
+    
+    Large notebooks are streamed with ijson (if installed) so cell outputs
+    and metadata are never materialized. Otherwise the file is parsed with
+    orjson when available, falling back to the stdlib json module.
+    """
+    if ijson is not None and os.path.getsize(filepath) >= NOTEBOOK_STREAM_THRESHOLD_BYTES:
+        with open(filepath, 'rb') as f:
+            yield from ijson.items(f, 'cells.item.source')
+        return
+    
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    notebook = orjson.loads(data) if orjson is not None else json.loads(data)
+    
+    for cell in notebook.get('cells', []):
+        yield cell.get('source', [])
 
 
 def _extract_code(filepath):
     """Extract raw text from a code file (.py, .c, .lex).
     
-    Reads up to the configured maximum number of lines.
+    Reads up to the configured maximum number of lines. The file is
+    memory-mapped and only the bytes up to the last kept line end are
+    decoded, so large files cost no more than their first max_lines.
     """
-    config = load_config()
+    config = get_config()
     max_lines = config.get('code_max_lines', 500)
     
-    lines = []
-    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-        for i, line in enumerate(f):
-            if i >= max_lines:
-                break
-            lines.append(line.rstrip('\n'))
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            nl = mm.find(b'\n')
+            for _ in range(max_lines):
+                # A line ends at \n, \r\n or a bare \r (old Mac line endings)
+                end = mm.find(b'\r', pos, nl if nl >= 0 else len(mm))
+                if end < 0 or end == nl - 1:
+                    end = nl
+                if end < 0:
+                    pos = len(mm)
+                    break
+                pos = end + 1
+                if 0 <= nl < pos:
+                    nl = mm.find(b'\n', pos)
+            text = mm[:pos].decode('utf-8', errors='replace')
     
-    return "\n".join(lines)
+    # Match text-mode reading: normalize line endings, drop the final newline
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if text.endswith('\n'):
+        text = text[:-1]
+    return text
+
+
+# Extension -> extractor lookup used by extract_text()
+_DISPATCH = {
+    '.pdf': _extract_pdf,
+    '.docx': _extract_docx,
+    '.pptx': _extract_pptx,
+    '.jpg': _extract_image,
+    '.jpeg': _extract_image,
+    '.png': _extract_image,
+    '.ipynb': _extract_notebook,
+    '.py': _extract_code,
+    '.c': _extract_code,
+    '.lex': _extract_code,
+}
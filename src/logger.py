@@ -3,32 +3,39 @@ Logging setup for AutoSorter.
 
 Provides rotating file logger that writes to AppData\\Local\\AutoSorter\\logs\\.
 Logs are rotated at 5MB with 5 backup files retained.
+
+Records are handed to a background QueueListener thread that owns the file
+and console handlers, so logging never blocks worker threads on I/O.
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from src.config import LOG_DIR, load_config
+from src.config import LOG_DIR, get_config
 
 _logger = None
+_listener = None
 
 
 def setup_logging():
     """Initialize the application-wide logger.
     
     Creates the log directory if needed and configures a rotating file handler
-    with console output for development/debugging.
+    with console output for development/debugging. Both handlers run on a
+    QueueListener thread; the logger itself only enqueues records.
     
     Returns:
         logging.Logger: Configured logger instance.
     """
-    global _logger
+    global _logger, _listener
     if _logger is not None:
         return _logger
 
     os.makedirs(LOG_DIR, exist_ok=True)
-    config = load_config()
+    config = get_config()
 
     logger = logging.getLogger('AutoSorter')
     logger.setLevel(logging.DEBUG)
@@ -49,7 +56,6 @@ def setup_logging():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
     # Console handler for terminal visibility
     console_handler = logging.StreamHandler()
@@ -59,7 +65,13 @@ def setup_logging():
         datefmt='%H:%M:%S'
     )
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+
+    # Hand records to a background thread that owns the real handlers
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
 
     _logger = logger
     return logger
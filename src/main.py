@@ -8,12 +8,14 @@ into structured subject folders.
 Usage:
     python -m src.main
     python -m src.main --config path/to/config.json
+    python -m src.main --config path/to/config.json --ipc-socket /tmp/autosorter.sock
     
 Or when packaged:
     AutoSorter.exe
 """
 
 import argparse
+import queue
 import signal
 import sys
 import os
@@ -26,6 +28,10 @@ from src.logger import setup_logging, get_logger
 from src.classifier import ClassificationEngine
 from src.worker import WorkerPool
 from src.watcher import FileWatcher
+from src.control import ControlServer
+
+# Seconds a control-socket reset waits for the new watcher to come up
+RESET_START_TIMEOUT_SECONDS = 60
 
 
 class MockClassifier:
@@ -38,12 +44,23 @@ class MockClassifier:
         """Return a fixed classification instantly."""
         return (self.category_names[0] if self.category_names else 'Unknown', 0.75)
     
+    def classify_batch(self, texts):
+        """Return a fixed classification for each text instantly."""
+        return [self.classify(text) for text in texts]
+    
+    def classify_filename(self, filename):
+        """Never match on filenames, so every file exercises the full pipeline."""
+        return None
+    
     def precompute_categories(self, categories):
         """No-op for mock."""
         self.category_names = list(categories.keys())
+    
+    def close(self):
+        """No-op for mock."""
 
 
-def main(config_path=None):
+def main(config_path=None, ipc_socket=None):
     """Main startup orchestrator.
     
     1. Initialize logging
@@ -52,6 +69,13 @@ def main(config_path=None):
     4. Load embedding model and precompute category embeddings
     5. Start worker pool
     6. Start file watcher (blocks until shutdown)
+    
+    Args:
+        config_path: Optional path to a custom config.json.
+        ipc_socket: Optional Unix socket path for control commands (see
+                    src.control). A "reset" command swaps in the folders of
+                    a new config file and clears the processed registry,
+                    keeping the loaded classifier.
     """
     # Step 1: Logging
     setup_logging()
@@ -69,7 +93,7 @@ def main(config_path=None):
         logger.info(f"Confidence threshold: {config.get('confidence_threshold', 0.50)}")
         
         # Step 3: Ensure directories
-        ensure_directories()
+        ensure_directories(categories)
         logger.info(f"Monitoring: {get_source_dir()}")
         
         # Step 4: Load model and precompute (or mock)
@@ -77,20 +101,74 @@ def main(config_path=None):
             logger.info("Using MOCK classifier (stress test mode)")
             engine = MockClassifier(categories)
         else:
-            engine = ClassificationEngine(model_name=config.get('model_name', 'all-MiniLM-L6-v2'))
+            engine = ClassificationEngine(
+                model_name=config.get('model_name', 'all-MiniLM-L6-v2'),
+                device=config.get('device'),
+                compile_model=config.get('compile_model', False),
+                lazy_load=config.get('lazy_model_load', False),
+                use_onnx=config.get('use_onnx', True),
+                onnx_int8=config.get('onnx_int8', False),
+            )
         engine.precompute_categories(categories)
         
         # Step 5: Start worker pool
         worker = WorkerPool(engine, config)
         
         # Step 6: Start watcher
-        watcher = FileWatcher(worker, config, get_source_dir())
+        current = {
+            'watcher': FileWatcher(worker, config, get_source_dir()),
+            'config_path': config_path,  # Config the current watcher was built from
+        }
+        restarts = queue.Queue()  # Watchers to run after the current one stops; None ends main()
+        control = None
+        
+        def reset(request):
+            """Control command: switch to the folders in a new config file.
+            
+            On failure the old folders are watched again and the error is
+            returned to the caller; the app keeps running.
+            """
+            old = current['watcher']
+            old.wait_started()
+            old.stop()  # The main loop below now waits for the next watcher
+            worker_reset = False
+            try:
+                new_config = load_config(request['config'])
+                ensure_directories(categories)
+                worker_reset = True
+                worker.reset(new_config)
+                current['watcher'] = FileWatcher(worker, new_config, get_source_dir())
+                current['config_path'] = request['config']
+            except Exception as e:
+                logger.error(f"Reset failed, resuming the previous folders: {e}")
+                try:
+                    old_config = load_config(current['config_path'])
+                    if worker_reset:
+                        worker.reset(old_config)  # Put back the old destination and threshold
+                    current['watcher'] = FileWatcher(worker, old_config, get_source_dir())
+                except Exception:
+                    logger.critical("Could not resume the previous folders", exc_info=True)
+                    restarts.put(None)  # Nothing left to watch; main() shuts down
+                    raise
+                restarts.put(current['watcher'])
+                raise
+            restarts.put(current['watcher'])
+            if not current['watcher'].wait_started(timeout=RESET_START_TIMEOUT_SECONDS):
+                raise TimeoutError("file watcher did not restart")
+            logger.info(f"Reset complete. Monitoring: {get_source_dir()}")
+        
+        if ipc_socket:
+            control = ControlServer(ipc_socket, {'reset': reset})
+            control.start()
         
         # Register graceful shutdown handlers
         def shutdown_handler(signum, frame):
             logger.info(f"Received signal {signum}, shutting down gracefully...")
-            watcher.stop()
+            if control is not None:
+                control.stop()
+            current['watcher'].stop()
             worker.shutdown()
+            engine.close()
             logger.info("AutoSorter shut down successfully")
             sys.exit(0)
         
@@ -99,8 +177,19 @@ def main(config_path=None):
         
         logger.info("AutoSorter is running. Monitoring for new files...")
         
-        # This blocks until stopped
-        watcher.start()
+        # This blocks until stopped; a control reset stops the watcher and
+        # queues its replacement
+        watcher = current['watcher']
+        while watcher is not None:
+            watcher.start()
+            watcher = restarts.get() if control is not None else None
+        
+        if control is not None:
+            # Only reached when a failed reset left nothing to watch
+            control.stop()
+            worker.shutdown()
+            engine.close()
+            logger.info("AutoSorter shut down successfully")
         
     except Exception as e:
         logger.critical(f"Fatal error during startup: {e}", exc_info=True)
@@ -111,5 +200,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='AutoSorter')
     parser.add_argument('--config', type=str, default=None,
                         help='Path to custom config.json')
+    parser.add_argument('--ipc-socket', type=str, default=None,
+                        help='Unix socket path to accept control commands on (used by the stress test)')
     args = parser.parse_args()
-    main(config_path=args.config)
+    main(config_path=args.config, ipc_socket=args.ipc_socket)
@@ -2,23 +2,37 @@
 File movement logic for AutoSorter.
 
 Handles moving classified files to Desktop/Subjects/<Category>/ with
-filename conflict resolution (timestamp appending) and directory creation.
+filename conflict resolution (time_ns suffix appending) and directory creation.
+
+Destination names are claimed atomically with O_CREAT|O_EXCL, so concurrent
+moves of same-named files never overwrite each other. Files are then moved
+with a single os.replace rename, falling back to shutil.move across devices.
+The destination's device id is cached, so only the source is stat'ed to
+decide between the two. Moves never fsync; callers can flush destination
+directories once per batch with sync_directories().
 """
 
+import errno
 import os
 import shutil
-from datetime import datetime
+import time
 
 from src.config import get_destination_dir
 from src.logger import get_logger
 
+# Destination base directory -> st_dev, filled on first move into each base
+_dest_devices = {}
+
+# Category directories already created (or confirmed) by this process
+_created_dirs = set()
+
 
 def move_file(filepath, category, destination_base=None):
     """Move a file to the appropriate subject folder.
     
-    Creates the destination directory if it doesn't exist.
-    If a file with the same name already exists, appends a timestamp
-    to the filename to prevent overwriting.
+    Creates the destination directory on first use in this process.
+    If a file with the same name already exists, appends a nanosecond
+    timestamp to the filename to prevent overwriting.
     
     Args:
         filepath: Absolute path to the source file.
@@ -37,20 +51,112 @@ def move_file(filepath, category, destination_base=None):
     # Ensure destination directory exists
     base = destination_base or get_destination_dir()
     dest_dir = os.path.join(base, category)
-    os.makedirs(dest_dir, exist_ok=True)
+    if dest_dir not in _created_dirs:
+        os.makedirs(dest_dir, exist_ok=True)
+        _created_dirs.add(dest_dir)
     
     filename = os.path.basename(filepath)
-    dest_path = os.path.join(dest_dir, filename)
+    try:
+        dest_path = _reserve_dest_path(dest_dir, filename)
+    except FileNotFoundError:
+        # Category folder was removed after it was created
+        os.makedirs(dest_dir, exist_ok=True)
+        dest_path = _reserve_dest_path(dest_dir, filename)
     
-    # Handle filename conflicts by appending timestamp
-    if os.path.exists(dest_path):
-        name, ext = os.path.splitext(filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        new_filename = f"{name}_{timestamp}{ext}"
-        dest_path = os.path.join(dest_dir, new_filename)
-        logger.info(f"Filename conflict resolved: {filename} -> {new_filename}")
+    if os.path.basename(dest_path) != filename:
+        logger.info("Filename conflict resolved: %s -> %s", filename, os.path.basename(dest_path))
     
-    shutil.move(filepath, dest_path)
-    logger.info(f"Moved: {filename} -> {dest_path}")
+    try:
+        if _same_device(filepath, base):
+            try:
+                os.replace(filepath, dest_path)
+            except OSError as e:
+                # e.g. a category folder that is itself a mount point
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(filepath, dest_path)
+        else:
+            # Different filesystem: rename is impossible, copy then delete
+            shutil.move(filepath, dest_path)
+    except OSError:
+        _remove_placeholder(dest_path)
+        raise
+    logger.info("Moved: %s -> %s", filename, dest_path)
     
     return dest_path
+
+
+def _same_device(filepath, base):
+    """Check whether a file lives on the same filesystem as a destination base.
+    
+    Args:
+        filepath: Source file path.
+        base: Destination base directory (must exist).
+        
+    Returns:
+        bool: True if a rename between the two can succeed.
+    """
+    dest_dev = _dest_devices.get(base)
+    if dest_dev is None:
+        dest_dev = _dest_devices[base] = os.stat(base).st_dev
+    return os.stat(filepath).st_dev == dest_dev
+
+
+def _reserve_dest_path(dest_dir, filename):
+    """Atomically claim a free destination path for a file.
+    
+    Creates an empty placeholder with O_CREAT|O_EXCL, trying name.ext and
+    then name_<time_ns>.ext until one does not exist yet. The nanosecond
+    suffix makes a second collision practically impossible, so a conflict
+    costs one extra probe however many copies already exist. The caller
+    replaces the placeholder with the real file.
+    
+    Args:
+        dest_dir: Destination directory.
+        filename: Original file name.
+        
+    Returns:
+        str: Path of the reserved (placeholder) destination file.
+    """
+    name, ext = os.path.splitext(filename)
+    candidate = filename
+    while True:
+        dest_path = os.path.join(dest_dir, candidate)
+        try:
+            fd = os.open(dest_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            candidate = f"{name}_{time.time_ns()}{ext}"
+            continue
+        os.close(fd)
+        return dest_path
+
+
+def _remove_placeholder(dest_path):
+    """Delete a reserved destination placeholder after a failed move."""
+    try:
+        os.remove(dest_path)
+    except OSError:
+        pass
+
+
+def sync_directories(directories):
+    """Flush directory entries to disk, one fsync per directory.
+    
+    Called once after a batch of moves rather than per file. Platforms
+    that can't open directories (Windows) are skipped silently.
+    
+    Args:
+        directories: Iterable of directory paths.
+    """
+    logger = get_logger()
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            logger.debug("Could not fsync %s: %s", directory, e)
+        finally:
+            os.close(fd)
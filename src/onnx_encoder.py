@@ -0,0 +1,195 @@
+"""
+ONNX Runtime encoder for AutoSorter.
+
+Exports the sentence-transformers backbone to ONNX once (via optimum) and
+runs inference through onnxruntime with full graph optimizations on the
+CPU execution provider. Mean pooling and L2 normalization are done in
+NumPy, reproducing the all-MiniLM-L6-v2 pipeline.
+
+The exported model can optionally be dynamically quantized to int8
+weights (ORTQuantizer), which speeds up CPU encoding further and shrinks
+the model file about 4x.
+
+The encoder exposes the subset of SentenceTransformer.encode() used by
+ClassificationEngine, so it can be swapped in transparently. All
+dependencies are optional; load_onnx_encoder() returns None when they
+are missing or the export fails.
+"""
+
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+from src.config import MODELS_DIR
+from src.logger import get_logger
+
+# Token limit applied by the sentence-transformers MiniLM models
+ONNX_MAX_SEQ_LENGTH = 256
+
+ONNX_MODEL_FILENAME = 'model.onnx'
+ONNX_QUANTIZED_MODEL_FILENAME = 'model_quantized.onnx'
+
+# Optional dependencies, probed without importing them: onnxruntime runs
+# the model, optimum is needed only to export (and quantize) it once
+HAS_ONNXRUNTIME = importlib.util.find_spec('onnxruntime') is not None
+HAS_OPTIMUM = importlib.util.find_spec('optimum') is not None
+
+
+class OnnxEncoder:
+    """Sentence encoder backed by an ONNX Runtime inference session."""
+
+    def __init__(self, model_dir, model_filename=ONNX_MODEL_FILENAME):
+        """Create an inference session for an exported model directory.
+
+        Args:
+            model_dir: Directory containing the ONNX model and tokenizer files.
+            model_filename: ONNX file to load from model_dir.
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_filename),
+            sess_options=options,
+            providers=['CPUExecutionProvider'],
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        # Fast tokenizers can't be called from several threads at once
+        # ("Already borrowed"); the session itself is thread-safe
+        self._tokenizer_lock = threading.Lock()
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, sentences, batch_size=64, convert_to_numpy=True,
+               normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        """Encode sentences into mean-pooled embeddings.
+
+        Args:
+            sentences: List of strings to encode.
+            batch_size: Number of sentences per inference call.
+            convert_to_numpy: Accepted for API compatibility; always numpy.
+            normalize_embeddings: If True, L2-normalize each embedding.
+            show_progress_bar: Accepted for API compatibility; ignored.
+
+        Returns:
+            np.ndarray: float32 array of shape (len(sentences), dim).
+        """
+        parts = []
+        for start in range(0, len(sentences), batch_size):
+            batch = list(sentences[start:start + batch_size])
+            with self._tokenizer_lock:
+                tokens = self.tokenizer(
+                    batch,
+                    padding=True,
+                    truncation=True,
+                    max_length=ONNX_MAX_SEQ_LENGTH,
+                    return_tensors='np',
+                )
+            feeds = {
+                name: tokens[name].astype(np.int64)
+                for name in ('input_ids', 'attention_mask', 'token_type_ids')
+                if name in self._input_names and name in tokens
+            }
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = tokens['attention_mask'][..., None].astype(np.float32)
+            summed = (hidden * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            parts.append(summed / counts)
+
+        embeddings = np.concatenate(parts).astype(np.float32, copy=False)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def _model_dir(model_name):
+    """Return the directory an exported model is stored in."""
+    safe_name = model_name.replace(':', '').replace('\\', '__').replace('/', '__')
+    return os.path.join(MODELS_DIR, safe_name)
+
+
+def onnx_backend_available(model_name, quantize=False):
+    """Tell whether load_onnx_encoder() can be expected to succeed.
+
+    True when onnxruntime is installed and the model is either already
+    exported (and quantized, if requested) or optimum is there to do it.
+
+    Args:
+        model_name: sentence-transformers model name or Hugging Face id.
+        quantize: If True, the int8 copy of the model is required.
+
+    Returns:
+        bool: Whether the ONNX backend is usable for this model.
+    """
+    if not HAS_ONNXRUNTIME:
+        return False
+    if HAS_OPTIMUM:
+        return True
+    filename = ONNX_QUANTIZED_MODEL_FILENAME if quantize else ONNX_MODEL_FILENAME
+    return os.path.exists(os.path.join(_model_dir(model_name), filename))
+
+
+def load_onnx_encoder(model_name, quantize=False):
+    """Load an ONNX encoder for a model, exporting it on first use.
+
+    Args:
+        model_name: sentence-transformers model name or Hugging Face id.
+        quantize: If True, load a dynamically int8-quantized copy of the
+                  model, creating it on first use.
+
+    Returns:
+        OnnxEncoder or None: The encoder, or None if ONNX Runtime/optimum
+        are unavailable or the export fails.
+    """
+    logger = get_logger()
+    if not onnx_backend_available(model_name, quantize):
+        logger.debug("onnxruntime or optimum not installed — using PyTorch backend")
+        return None
+
+    model_dir = _model_dir(model_name)
+    try:
+        if not os.path.exists(os.path.join(model_dir, ONNX_MODEL_FILENAME)):
+            _export_model(model_name, model_dir)
+        if not quantize:
+            return OnnxEncoder(model_dir)
+        if not os.path.exists(os.path.join(model_dir, ONNX_QUANTIZED_MODEL_FILENAME)):
+            _quantize_model(model_dir)
+        return OnnxEncoder(model_dir, ONNX_QUANTIZED_MODEL_FILENAME)
+    except Exception as e:
+        logger.warning(f"ONNX backend unavailable, using PyTorch backend: {e}")
+        return None
+
+
+def _export_model(model_name, model_dir):
+    """Export a Hugging Face model and its tokenizer to ONNX."""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+
+    logger = get_logger()
+    hub_id = model_name if '/' in model_name or os.path.isdir(model_name) else f'sentence-transformers/{model_name}'
+    logger.info(f"Exporting {hub_id} to ONNX (one-time): {model_dir}")
+
+    os.makedirs(model_dir, exist_ok=True)
+    model = ORTModelForFeatureExtraction.from_pretrained(hub_id, export=True)
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(hub_id).save_pretrained(model_dir)
+    logger.info("ONNX export complete")
+
+
+def _quantize_model(model_dir):
+    """Write a dynamically int8-quantized copy of an exported model."""
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    logger = get_logger()
+    logger.info(f"Quantizing ONNX model to int8 (one-time): {model_dir}")
+
+    quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=ONNX_MODEL_FILENAME)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=model_dir, quantization_config=qconfig)
+    logger.info("ONNX quantization complete")
@@ -0,0 +1,146 @@
+"""
+Elastic thread pool for AutoSorter.
+
+A small executor in the style of concurrent.futures.ThreadPoolExecutor
+that keeps core_workers threads alive, grows up to max_workers under a
+burst of work, and lets the extra threads exit once they have been idle
+for idle_timeout seconds. Long quiet periods therefore cost only the
+core threads, while bursts are not capped at the core size.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+
+# Seconds a thread above the core size may sit idle before exiting
+DEFAULT_IDLE_TIMEOUT_SECONDS = 30.0
+
+# Queue sentinel telling one worker thread to exit
+_STOP = None
+
+# Marker for a queue wait that timed out
+_IDLE_TIMEOUT = object()
+
+
+class ElasticThreadPool:
+    """Thread pool that scales between a core and a maximum thread count."""
+
+    def __init__(self, core_workers, max_workers, idle_timeout=DEFAULT_IDLE_TIMEOUT_SECONDS,
+                 thread_name_prefix='AutoSorterWorker'):
+        """Create the pool. Threads are started on demand.
+
+        Args:
+            core_workers: Threads kept alive even when idle (at least 1).
+            max_workers: Upper bound on concurrent threads.
+            idle_timeout: Seconds before an idle thread above the core exits.
+            thread_name_prefix: Prefix for worker thread names.
+        """
+        self._core = max(1, core_workers)
+        self._max = max(self._core, max_workers)
+        self._idle_timeout = idle_timeout
+        self._prefix = thread_name_prefix
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads = set()
+        self._idle = 0  # Threads currently waiting for work
+        self._counter = 0
+        self._shutdown = False
+
+    @property
+    def num_threads(self):
+        """int: Number of live worker threads."""
+        return len(self._threads)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return a Future for its result.
+
+        Raises:
+            RuntimeError: If the pool has been shut down.
+        """
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._queue.put((future, fn, args, kwargs))
+            # Grow only when queued work outnumbers the waiting threads
+            if self._queue.qsize() > self._idle and len(self._threads) < self._max:
+                self._start_thread()
+        return future
+
+    def scale_workers(self, max_workers):
+        """Change the maximum thread count at runtime.
+
+        Shrinking asks surplus threads to exit once they finish their
+        current task; growing takes effect as new work arrives.
+
+        Args:
+            max_workers: New upper bound on concurrent threads (at least 1).
+        """
+        with self._lock:
+            self._max = max(1, max_workers)
+            self._core = min(self._core, self._max)
+            excess = len(self._threads) - self._max
+        for _ in range(max(0, excess)):
+            self._queue.put(_STOP)
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and let the threads exit after the queue drains.
+
+        Args:
+            wait: If True, block until every queued task has finished.
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _start_thread(self):
+        """Start one worker thread. Caller must hold _lock."""
+        self._counter += 1
+        thread = threading.Thread(
+            target=self._worker,
+            name=f"{self._prefix}-{self._counter}",
+            daemon=True,
+        )
+        self._threads.add(thread)
+        thread.start()
+
+    def _worker(self):
+        """Worker thread: run queued tasks until stopped or idle too long."""
+        me = threading.current_thread()
+        while True:
+            with self._lock:
+                self._idle += 1
+            try:
+                item = self._queue.get(timeout=self._idle_timeout)
+            except queue.Empty:
+                item = _IDLE_TIMEOUT
+            with self._lock:
+                self._idle -= 1
+                if item is _IDLE_TIMEOUT:
+                    if len(self._threads) > self._core and self._queue.empty():
+                        self._threads.discard(me)
+                        return
+                    continue
+                if item is _STOP:
+                    self._threads.discard(me)
+                    return
+                # submit() may have counted this thread as idle after it
+                # took its item; grow here so queued work isn't left waiting
+                if (not self._shutdown and self._queue.qsize() > self._idle
+                        and len(self._threads) < self._max):
+                    self._start_thread()
+
+            future, fn, args, kwargs = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            del item, future
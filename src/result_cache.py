@@ -0,0 +1,110 @@
+"""
+Classification result cache for AutoSorter.
+
+Maps the SHA-256 of a file's contents to its last classification result,
+so re-downloaded files (same content, any name) skip extraction and the
+embedding model entirely. Results are stored in a small SQLite database
+and tagged with the classifier's categories key; a lookup made under a
+different model or category set is treated as a miss.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+from src.logger import get_logger
+
+HASH_READ_SIZE = 1024 * 1024  # Bytes read per hashing step
+
+
+def file_digest(filepath):
+    """Compute the SHA-256 hex digest of a file's contents.
+    
+    Args:
+        filepath: Absolute path to the file.
+        
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe SQLite store of content hash -> (category, score)."""
+
+    def __init__(self, path):
+        """Open (or create) the cache database.
+        
+        Args:
+            path: Path to the SQLite database file.
+            
+        Raises:
+            sqlite3.Error: If the database is locked, corrupt or unwritable.
+            OSError: If its directory can't be created.
+        """
+        self.logger = get_logger()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            # WAL with synchronous=NORMAL: commits append to the WAL without an
+            # fsync each, so storing a result stays off the disk-flush path
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "digest TEXT PRIMARY KEY, namespace TEXT, category TEXT, score REAL)"
+            )
+            self._conn.commit()
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+
+    def get(self, digest, namespace):
+        """Look up a cached result.
+        
+        Args:
+            digest: SHA-256 hex digest of the file contents.
+            namespace: Classifier categories key the result must match.
+            
+        Returns:
+            tuple or None: (category, score), or None on a miss.
+        """
+        try:
+            with self._lock:
+                return self._conn.execute(
+                    "SELECT category, score FROM results WHERE digest = ? AND namespace = ?",
+                    (digest, namespace),
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not read cached result: {e}")
+            return None
+
+    def put(self, digest, namespace, category, score):
+        """Store (or replace) the result for a file's contents.
+        
+        Args:
+            digest: SHA-256 hex digest of the file contents.
+            namespace: Classifier categories key the result was produced under.
+            category: Predicted category name.
+            score: Similarity score for the predicted category.
+        """
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (digest, namespace, category, score) VALUES (?, ?, ?, ?)",
+                    (digest, namespace, category, score),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not store cached result: {e}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -4,11 +4,24 @@ File system watcher for AutoSorter.
 Uses the watchdog library to monitor the Downloads folder for new files.
 Handles file readiness checks (waits for downloads to complete) and
 filters by supported extensions before submitting to the worker pool.
+
+New files are tracked in a pending table updated by watchdog events. A
+single reaper thread promotes a file once no events have arrived for
+watch_delay_seconds and its size is stable. Ready files are pushed onto a
+queue and coalesced into small batches by a single consumer thread, so
+bursts of downloads are classified together.
+
+Watchdog already uses the native notification APIs (inotify on Linux,
+ReadDirectoryChangesW on Windows). Close-after-write events (inotify
+IN_CLOSE_WRITE) and renames into the folder (e.g. .crdownload -> .pdf)
+mark a download as finished, so those files skip the quiescence wait.
 """
 
 import os
+import queue
 import time
 import threading
+from collections import OrderedDict
 
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -16,6 +29,15 @@ from watchdog.events import FileSystemEventHandler
 from src.config import ALL_SUPPORTED_EXTENSIONS, load_config
 from src.logger import get_logger
 
+# Readiness tracking configuration
+REAP_INTERVAL_SECONDS = 0.5   # How often pending files are checked for quiescence
+READY_TIMEOUT_SECONDS = 30    # Give up on a quiet file that stays locked this long
+RECENT_FILES_MAX = 4096       # Cap on remembered submissions for debounce
+
+# DirEntry.stat() reports st_dev/st_ino as 0 on Windows, so there the worker
+# pool must stat scanned files itself to build its registry keys
+DIRENTRY_STAT_HAS_INODE = os.name != 'nt'
+
 
 class FileWatcher:
     """Monitors the Downloads folder and submits new files for processing.
@@ -24,6 +46,15 @@ class FileWatcher:
     file readiness (waiting for downloads to complete before processing).
     """
 
+    # Fixed attribute layout: faster attribute access on the event path
+    __slots__ = (
+        'worker_pool', 'config', 'watch_dir', 'logger', 'delay', 'max_file_size',
+        'ignored_extensions', '_accept_exts', 'observer', '_handler',
+        '_recent_files', '_debounce_seconds', '_pending', '_pending_lock',
+        '_reaper_thread', '_reap_now', 'max_batch_size', 'batch_timeout',
+        '_ready_queue', '_stop_event', '_batch_thread', '_started',
+    )
+
     def __init__(self, worker_pool, config, watch_dir):
         """Initialize the file watcher.
         
@@ -39,20 +70,38 @@ class FileWatcher:
         self.delay = config.get('watch_delay_seconds', 2)
         self.max_file_size = config.get('max_file_size_mb', 100) * 1024 * 1024  # Convert to bytes
         self.ignored_extensions = set(config.get('ignored_extensions', []))
+        # Single lookup set for the per-event extension filter
+        self._accept_exts = frozenset(
+            ext.lower() for ext in ALL_SUPPORTED_EXTENSIONS if ext.lower() not in self.ignored_extensions
+        )
         
         self.observer = Observer()
         self._handler = _NewFileHandler(self)
-        self._recent_files = {}  # filepath -> timestamp for debounce
+        self._recent_files = OrderedDict()  # filepath -> submit timestamp, oldest first
         self._debounce_seconds = 5
         
-        self.logger.info(f"File watcher configured for: {watch_dir}")
+        # filepath -> [last_event_ts, last_seen_size, first_unready_ts]
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._reaper_thread = None
+        self._reap_now = threading.Event()  # Wakes the reaper early for completed files
+        
+        # Micro-batching of ready files before submission
+        self.max_batch_size = config.get('max_batch_size', 32)
+        self.batch_timeout = config.get('batch_timeout_ms', 200) / 1000.0
+        self._ready_queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._batch_thread = None
+        self._started = threading.Event()  # Set once the observer is running
+        
+        self.logger.info("File watcher configured for: %s", watch_dir)
 
     def start(self):
         """Start watching the Downloads folder. Blocks until stopped.
         
         Also performs an initial scan of existing files in the directory.
         """
-        self.logger.info(f"Starting file watcher on: {self.watch_dir}")
+        self.logger.info("Starting file watcher on: %s", self.watch_dir)
         
         # Scan existing files if configured
         if self.config.get('scan_existing_on_startup', False):
@@ -60,8 +109,14 @@ class FileWatcher:
         else:
             self.logger.info("Startup scan disabled — watching for new files only")
         
+        self._batch_thread = threading.Thread(target=self._batch_consumer, daemon=True)
+        self._batch_thread.start()
+        self._reaper_thread = threading.Thread(target=self._reap_pending, daemon=True)
+        self._reaper_thread.start()
+        
         self.observer.schedule(self._handler, self.watch_dir, recursive=False)
         self.observer.start()
+        self._started.set()
         
         try:
             while self.observer.is_alive():
@@ -72,135 +127,238 @@ class FileWatcher:
     def _scan_existing(self):
         """Scan the Downloads folder for existing supported files.
         
-        Submits any supported files found to the worker pool.
+        Submits all supported files found to the worker pool in one batch.
         This catches files that were downloaded before the watcher started.
+        Uses os.scandir so type and size come from the directory listing
+        (no extra stat calls on Windows) and only for supported extensions.
+        Where the entry's stat is complete it is handed to the worker pool,
+        which then doesn't stat the file again.
         """
         self.logger.info("Scanning existing files in Downloads...")
-        count = 0
+        filepaths = []
+        stats = []
         try:
-            for filename in os.listdir(self.watch_dir):
-                filepath = os.path.join(self.watch_dir, filename)
-                if not os.path.isfile(filepath):
-                    continue
-                
-                ext = os.path.splitext(filename)[1].lower()
-                if ext in self.ignored_extensions:
-                    continue
-                if ext not in ALL_SUPPORTED_EXTENSIONS:
-                    continue
-                
-                # Check file size
-                try:
-                    file_size = os.path.getsize(filepath)
-                    if file_size > self.max_file_size or file_size == 0:
+            with os.scandir(self.watch_dir) as entries:
+                for entry in entries:
+                    # Filter by extension before touching stat()
+                    name = entry.name
+                    dot = name.rfind('.')
+                    if dot < 0 or name[dot:].lower() not in self._accept_exts:
                         continue
-                except OSError:
-                    continue
-                
-                self.worker_pool.submit(filepath)
-                count += 1
+                    
+                    # Check type and size from the cached directory entry
+                    try:
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                        if st.st_size > self.max_file_size or st.st_size == 0:
+                            continue
+                    except OSError:
+                        continue
+                    
+                    filepaths.append(entry.path)
+                    stats.append(st if DIRENTRY_STAT_HAS_INODE else None)
         except OSError as e:
-            self.logger.error(f"Error scanning Downloads: {e}")
+            self.logger.error("Error scanning Downloads: %s", e)
         
-        self.logger.info(f"Startup scan complete: {count} supported files found")
+        self.logger.info("Startup scan complete: %d supported files found", len(filepaths))
+        self.worker_pool.submit_batch(filepaths, stats)
+
+    def wait_started(self, timeout=None):
+        """Block until start() has scanned the folder and the observer runs.
+        
+        Args:
+            timeout: Max seconds to wait, or None to wait indefinitely.
+            
+        Returns:
+            bool: True if the watcher is running.
+        """
+        return self._started.wait(timeout)
 
     def stop(self):
         """Stop the file watcher gracefully."""
         self.logger.info("Stopping file watcher...")
         self.observer.stop()
         self.observer.join()
+        self._stop_event.set()
+        self._reap_now.set()
+        if self._reaper_thread is not None:
+            self._reaper_thread.join()
+        if self._batch_thread is not None:
+            self._batch_thread.join()
         self.logger.info("File watcher stopped")
 
-    def _on_new_file(self, filepath):
+    def _batch_consumer(self):
+        """Drain ready files from the queue and submit them in batches.
+        
+        Blocks for the first file, then keeps collecting until either
+        max_batch_size files are gathered or batch_timeout elapses.
+        Remaining files are flushed when the watcher stops.
+        """
+        while not self._stop_event.is_set() or not self._ready_queue.empty():
+            try:
+                batch = [self._ready_queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+            
+            deadline = time.monotonic() + self.batch_timeout
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._ready_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self.worker_pool.submit_batch(batch)
+
+    def _on_new_file(self, filepath, complete=False):
         """Handle a new file detection event.
         
-        Debounces duplicate events (on_created + on_modified) for the same file.
-        Validates extension, checks size, waits for file readiness,
-        then submits to the worker pool.
+        Validates extension and records the event time in the pending table.
+        Repeated events for the same file (on_created + on_modified while a
+        download is written) just push its quiescence deadline back. Files
+        submitted within the last few seconds are ignored.
         
         Args:
             filepath: Absolute path to the new file.
+            complete: True if the event signals the writer is done (file
+                closed after writing, or renamed into place), in which
+                case the file is checked on the next reap.
         """
-        # Debounce: skip if we saw this file within the last N seconds
-        now = time.time()
-        if filepath in self._recent_files:
-            if now - self._recent_files[filepath] < self._debounce_seconds:
-                return
-        self._recent_files[filepath] = now
-        
-        filename = os.path.basename(filepath)
-        ext = os.path.splitext(filename)[1].lower()
-        
-        # Filter ignored extensions (e.g., .crdownload)
-        if ext in self.ignored_extensions:
+        # Filter ignored (e.g., .crdownload) and unsupported extensions first:
+        # most events are browser temp-file writes. A dot inside a directory
+        # name yields a suffix containing a separator, which never matches.
+        dot = filepath.rfind('.')
+        if dot < 0 or filepath[dot:].lower() not in self._accept_exts:
             return
         
-        # Filter unsupported extensions
-        if ext not in ALL_SUPPORTED_EXTENSIONS:
-            return
+        now = time.time()
         
-        self.logger.info(f"New file detected: {filename}")
+        # Debounce: skip if we submitted this file within the last N seconds
+        submitted_at = self._recent_files.get(filepath)
+        if submitted_at is not None and now - submitted_at < self._debounce_seconds:
+            return
         
-        # Wait for file to be ready in a separate thread
-        thread = threading.Thread(
-            target=self._wait_and_submit,
-            args=(filepath,),
-            daemon=True
-        )
-        thread.start()
-
-    def _wait_and_submit(self, filepath):
-        """Wait for file to be ready, then submit for processing.
+        pending = self._pending
+        reap_now = self._reap_now
         
-        Waits an initial delay, then retries access checks for up to 30s.
+        if complete:
+            # Backdate the event and record the size so the next reap promotes it
+            try:
+                size = os.path.getsize(filepath)
+            except OSError:
+                return
+            last_event = now - self.delay
+        else:
+            size = -1
+            last_event = now
         
-        Args:
-            filepath: Absolute path to the file.
-        """
-        filename = os.path.basename(filepath)
+        with self._pending_lock:
+            entry = pending.get(filepath)
+            if entry is not None:
+                entry[0] = last_event
+                if complete:
+                    entry[1] = size
+                    reap_now.set()
+                return
+            pending[filepath] = [last_event, size, None]
         
-        # Initial wait for download to settle
-        time.sleep(self.delay)
+        if complete:
+            reap_now.set()
         
-        # Retry loop until file is accessible
-        max_retries = 15
-        retry_interval = 2  # seconds
+        self.logger.info("New file detected: %s", os.path.basename(filepath))
+
+    def _reap_pending(self):
+        """Promote pending files to the ready queue once they go quiet.
         
-        for attempt in range(max_retries):
-            if not os.path.exists(filepath):
-                self.logger.debug(f"File disappeared during wait: {filename}")
-                return
+        Runs every REAP_INTERVAL_SECONDS, or immediately when a completion
+        event arrives. A file is ready when no events have
+        arrived for watch_delay_seconds, its size is unchanged since the
+        previous check, and it can be opened. Files that vanish, are too
+        large or empty, or stay locked past READY_TIMEOUT_SECONDS are dropped.
+        """
+        while not self._stop_event.is_set():
+            self._reap_now.wait(REAP_INTERVAL_SECONDS)
+            self._reap_now.clear()
+            if self._stop_event.is_set():
+                break
+            
+            now = time.time()
+            with self._pending_lock:
+                candidates = [
+                    (filepath, entry) for filepath, entry in self._pending.items()
+                    if now - entry[0] >= self.delay
+                ]
             
-            if self._is_file_ready(filepath):
-                # Check file size
+            for filepath, entry in candidates:
+                filename = os.path.basename(filepath)
                 try:
                     file_size = os.path.getsize(filepath)
-                    if file_size > self.max_file_size:
-                        self.logger.warning(
-                            f"File too large ({file_size / 1024 / 1024:.1f}MB > "
-                            f"{self.max_file_size / 1024 / 1024:.0f}MB): {filename}"
-                        )
-                        return
-                    if file_size == 0:
-                        self.logger.debug(f"Empty file, skipping: {filename}")
-                        return
                 except OSError:
+                    self.logger.debug("File disappeared during wait: %s", filename)
+                    self._drop_pending(filepath)
                     continue
                 
-                # Submit to worker pool
-                self.worker_pool.submit(filepath)
-                return
-            
-            self.logger.debug(f"File not ready (attempt {attempt + 1}/{max_retries}): {filename}")
-            time.sleep(retry_interval)
+                # Size must be stable across two consecutive reaps
+                if file_size != entry[1]:
+                    entry[1] = file_size
+                    continue
+                
+                if file_size > self.max_file_size:
+                    self.logger.warning(
+                        "File too large (%.1fMB > %.0fMB): %s",
+                        file_size / 1024 / 1024, self.max_file_size / 1024 / 1024, filename
+                    )
+                    self._drop_pending(filepath)
+                    continue
+                if file_size == 0:
+                    self.logger.debug("Empty file, skipping: %s", filename)
+                    self._drop_pending(filepath)
+                    continue
+                
+                if not self._is_file_ready(filepath):
+                    if entry[2] is None:
+                        entry[2] = now
+                    elif now - entry[2] > READY_TIMEOUT_SECONDS:
+                        self.logger.warning("File never became ready after %ds: %s", READY_TIMEOUT_SECONDS, filename)
+                        self._drop_pending(filepath)
+                    else:
+                        self.logger.debug("File not ready: %s", filename)
+                    continue
+                
+                # Hand off to the batch consumer
+                self._drop_pending(filepath)
+                self._remember_submitted(filepath, now)
+                self._ready_queue.put(filepath)
+
+    def _remember_submitted(self, filepath, now):
+        """Record a submission for debounce, evicting expired or excess entries.
         
-        self.logger.warning(f"File never became ready after {max_retries} attempts: {filename}")
+        Entries are kept in submission order, so eviction only ever looks at
+        the front. Memory stays bounded at RECENT_FILES_MAX entries.
+        """
+        recent = self._recent_files
+        recent[filepath] = now
+        recent.move_to_end(filepath)
+        while recent:
+            oldest_path, oldest_ts = next(iter(recent.items()))
+            if len(recent) <= RECENT_FILES_MAX and now - oldest_ts < self._debounce_seconds:
+                break
+            del recent[oldest_path]
+
+    def _drop_pending(self, filepath):
+        """Remove a file from the pending table."""
+        with self._pending_lock:
+            self._pending.pop(filepath, None)
 
     def _is_file_ready(self, filepath):
         """Check if a file is ready for processing (not locked by another process).
         
-        Attempts to open the file in exclusive mode. If successful, the file
-        is not being written to by another process.
+        Opens the file descriptor without reading any contents, so the probe
+        does not pull data into the page cache or trigger a full on-access
+        antivirus scan. Size stability is checked separately by the reaper.
         
         Args:
             filepath: Absolute path to the file.
@@ -209,12 +367,11 @@ class FileWatcher:
             bool: True if file is accessible and not locked.
         """
         try:
-            with open(filepath, 'rb') as f:
-                # Try to read a small chunk to verify access
-                f.read(1)
-            return True
-        except (OSError, IOError, PermissionError):
+            fd = os.open(filepath, os.O_RDONLY)
+        except OSError:
             return False
+        os.close(fd)
+        return True
 
 
 class _NewFileHandler(FileSystemEventHandler):
@@ -239,3 +396,22 @@ class _NewFileHandler(FileSystemEventHandler):
         if event.is_directory:
             return
         self.watcher._on_new_file(event.src_path)
+
+    def on_closed(self, event):
+        """Called when a file opened for writing is closed (inotify IN_CLOSE_WRITE).
+        
+        This fires when a browser finishes writing a download in place.
+        """
+        if event.is_directory:
+            return
+        self.watcher._on_new_file(event.src_path, complete=True)
+
+    def on_moved(self, event):
+        """Called when a file is renamed or moved into the watched directory.
+        
+        Browsers download to a temporary name (.crdownload, .part) and rename
+        it once complete, so the destination is ready immediately.
+        """
+        if event.is_directory:
+            return
+        self.watcher._on_new_file(event.dest_path, complete=True)
@@ -1,20 +1,109 @@
 """
 Worker pool for AutoSorter.
 
-Manages a ThreadPoolExecutor that processes files through the
-extract -> classify -> move pipeline. Maintains a processed file
-registry to prevent duplicate processing.
+Processes files through the extract -> classify -> move pipeline and
+maintains a processed file registry to prevent duplicate processing.
+
+Extraction and moves (disk-bound) run on an elastic I/O thread pool;
+classification (CPU-bound) runs on a separate pool of classify_threads
+threads (the CPU count by default). Stages hand off to each other
+through Future callbacks, so an I/O thread never sits idle waiting for
+the model.
+
+Files submitted together (startup scan, bursts of downloads) are
+processed in batches so the classifier embeds their chunks in shared
+encode calls, still stopping early per document once a category is
+clear. Each batch hands its texts to a shared ClassifyBatcher, so small
+batches from watcher flushes that arrive close together are classified
+in the same encode call; the batcher classifies on the same CPU pool (a
+lone text goes through classify()).
+
+Results are also cached by content hash, so a re-downloaded file is
+sorted without extracting or embedding it again.
+
+The processed registry holds (st_dev, st_ino, st_mtime_ns) tuples, so it
+survives renames, never confuses same-named files from different folders,
+and treats a modified file as new. It is an LRU capped at
+max_processed_entries; an evicted file is simply checked again if it
+ever reappears. Each file is stat'ed once at
+submit time and that result is reused for the rest of the pipeline.
+
+On disk the registry is a JSON snapshot plus an append-only JSONL log.
+Workers only update the in-memory registry and queue a log line; a
+background flusher thread appends queued lines in one write per burst
+(debounced), and folds the log back into the snapshot (compacts) once it
+outgrows it, or on shutdown.
 """
 
 import json
+import mmap
 import os
+import sqlite3
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the registry falls back to stdlib json
+    orjson = None
 
-from src.config import PROCESSED_FILES_PATH, DATA_DIR, load_config, get_file_type
+from src.config import PROCESSED_FILES_PATH, PROCESSED_LOG_PATH, DATA_DIR, RESULT_CACHE_PATH, load_config, file_type_for_ext
+from src.batcher import ClassifyBatcher
 from src.extractors import extract_text
-from src.mover import move_file
+from src.mover import move_file, sync_directories
+from src.pool import ElasticThreadPool
 from src.logger import get_logger, log_file_result
+from src.result_cache import ResultCache, file_digest
+
+# Documents per classify_batch call; batches are length-sorted first so
+# each call pads to similar-length inputs
+CLASSIFY_MINI_BATCH = 16
+
+# Score reported for files classified from their filename alone
+FILENAME_MATCH_SCORE = 1.0
+
+# Compact the registry log once it exceeds twice the snapshot (and this floor)
+REGISTRY_COMPACT_MIN_BYTES = 64 * 1024
+
+# Delay between a registry change and its flush, so bursts share one write
+REGISTRY_FLUSH_DEBOUNCE_SECONDS = 0.5
+
+# Tasks allowed in flight (queued or running) per worker thread; beyond
+# that, submitting blocks the caller (back-pressure on the watcher)
+QUEUE_SLOTS_PER_WORKER = 4
+
+
+def _dumps(obj):
+    """Serialize a registry object to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data):
+    """Parse registry JSON from bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(frozen=True)
+class FileJob:
+    """A file queued for processing, with everything derived from its path.
+    
+    Built once at submit time so the pipeline never re-derives the name,
+    type or stat of a file.
+    """
+    __slots__ = ('filepath', 'filename', 'file_type', 'st')
+    
+    filepath: str  # Absolute path to the file
+    filename: str  # Basename, for logging
+    file_type: str  # File type group: 'documents', 'images' or 'code'
+    st: os.stat_result  # Stat taken at submit time
 
 
 class WorkerPool:
@@ -36,145 +125,649 @@ class WorkerPool:
         self.logger = get_logger()
         self.threshold = config.get('confidence_threshold', 0.50)
         self.num_workers = config.get('worker_threads', 2)
+        self.max_workers = max(self.num_workers, config.get('max_worker_threads', self.num_workers))
         self.destination_dir = config.get('destination_dir', None)
-        self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        self.max_batch_size = config.get('max_batch_size', 32)
+        self.filename_fast_path = config.get('filename_fast_path', True)
+        self.fsync_moves = config.get('fsync_moves', False)
+        self._moved_dirs = set()  # Destination dirs awaiting fsync
+        self._moved_dirs_lock = threading.Lock()
+        self._error_counts = Counter()  # "ExcType:ext" -> occurrences
+        self._error_counts_lock = threading.Lock()
+        self.executor = ElasticThreadPool(
+            core_workers=self.num_workers,
+            max_workers=self.max_workers,
+            idle_timeout=config.get('worker_idle_timeout_seconds', 30),
+        )
+        self._cpu_pool = ThreadPoolExecutor(
+            max_workers=config.get('classify_threads', os.cpu_count() or 1),
+            thread_name_prefix='AutoSorterClassify',
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers * QUEUE_SLOTS_PER_WORKER)
+        self._inflight = 0  # Pipelines started and not yet finished
+        self._inflight_cond = threading.Condition()
+        self._snapshot_size = 0  # Size of the registry snapshot on disk, in bytes
+        self.max_processed_entries = config.get('max_processed_entries', 100000)
         self.processed_files = self._load_processed_files()
+        self._unflushed = []  # Registry log lines not yet written
+        self._registry_lock = threading.Lock()  # Guards processed_files and _unflushed
+        self._registry_io_lock = threading.Lock()  # Serializes flusher and reset() file writes
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        self.result_cache = None
+        if config.get('result_cache', True):
+            try:
+                self.result_cache = ResultCache(RESULT_CACHE_PATH)
+            except (sqlite3.Error, OSError) as e:
+                # Only an optimization; run without it rather than fail to start
+                self.logger.warning(f"Result cache unavailable, continuing without it: {e}")
+        batch_wait_ms = config.get('classify_batch_wait_ms', 50)
+        if batch_wait_ms > 0:
+            self._batcher = ClassifyBatcher(
+                self.classifier.classify_batch, CLASSIFY_MINI_BATCH, batch_wait_ms,
+                classify=self.classifier.classify, executor=self._cpu_pool,
+            )
+        else:
+            self._batcher = None
         
-        self.logger.info(f"Worker pool initialized: {self.num_workers} workers, threshold={self.threshold}")
+        self.logger.info(f"Worker pool initialized: {self.num_workers}-{self.max_workers} workers, threshold={self.threshold}")
         if self.destination_dir:
             self.logger.info(f"Destination directory: {self.destination_dir}")
 
-    def submit(self, filepath):
-        """Submit a file for processing.
+    def submit_batch(self, filepaths, stats=None):
+        """Submit several files for processing as classification batches.
         
-        Checks if the file was already processed before submitting.
+        Already-processed files are filtered out; the rest are split into
+        batches of at most max_batch_size files, one worker task per batch.
         
         Args:
-            filepath: Absolute path to the file to process.
+            filepaths: List of absolute paths to process.
+            stats: Optional list of os.stat_result (or None) aligned with
+                   filepaths, reused instead of stat'ing those files again.
         """
-        filename = os.path.basename(filepath)
-        
-        # Check if already processed
-        if self._is_already_processed(filepath):
-            self.logger.debug(f"Skipping already-processed file: {filename}")
+        if stats is None:
+            stats = [None] * len(filepaths)
+        pending = [job for job in map(self._new_job, filepaths, stats) if job is not None]
+        if not pending:
             return
         
-        self.logger.info(f"Queuing file for processing: {filename}")
-        self.executor.submit(self._process_file, filepath)
+        self.logger.info(f"Queuing {len(pending)} files for batch processing")
+        for start in range(0, len(pending), self.max_batch_size):
+            self._submit_task(partial(self._process_batch, pending[start:start + self.max_batch_size]))
 
-    def _process_file(self, filepath):
-        """Process a single file through the full pipeline.
-        
-        Extract text -> Classify -> Move or Keep.
-        All exceptions are caught to prevent worker thread crashes.
+    def _new_job(self, filepath, st=None):
+        """Stat a file and wrap it in a FileJob.
         
         Args:
             filepath: Absolute path to the file.
+            st: os.stat_result to reuse, or None to stat the file here.
+            
+        Returns:
+            FileJob or None: The job, or None if the file type is
+            unsupported, the file is gone, or it was already processed.
         """
         filename = os.path.basename(filepath)
-        file_type = get_file_type(filepath) or "UNKNOWN"
-        start_time = time.time()
+        file_type = file_type_for_ext(os.path.splitext(filename)[1].lower())
+        if file_type is None:
+            # No extractor would handle it; don't spend a worker slot or a stat
+            log_file_result(filename, "UNKNOWN", "N/A", 0.0, "KEPT (unsupported)", 0.0)
+            return None
         
-        try:
-            # Verify file still exists (could have been moved/deleted)
-            if not os.path.exists(filepath):
+        if st is None:
+            try:
+                st = os.stat(filepath)
+            except OSError:
                 self.logger.warning(f"File no longer exists: {filename}")
+                return None
+        
+        job = FileJob(filepath, filename, file_type, st)
+        if self._is_already_processed(job):
+            self.logger.debug(f"Skipping already-processed file: {filename}")
+            return None
+        return job
+
+    def scale_workers(self, max_workers):
+        """Change the maximum number of worker threads at runtime.
+        
+        The in-flight task limit stays as configured at startup.
+        
+        Args:
+            max_workers: New upper bound on concurrent worker threads.
+        """
+        self.max_workers = max_workers
+        self.executor.scale_workers(max_workers)
+        self.logger.info(f"Worker pool scaled to at most {max_workers} workers")
+
+    def _submit_task(self, task):
+        """Start a pipeline on the I/O pool, blocking while too many are in flight.
+        
+        A task may hand off to a later stage by returning a Future; the
+        pipeline's slot is held until the last stage has finished.
+        
+        Args:
+            task: Zero-argument callable to run on an I/O worker thread.
+        """
+        self._slots.acquire()
+        with self._inflight_cond:
+            self._inflight += 1
+        try:
+            future = self.executor.submit(task)
+        except RuntimeError:
+            # Executor already shut down
+            self._stage_done(None)
+            raise
+        future.add_done_callback(self._stage_done)
+
+    def _stage_done(self, future):
+        """Follow a finished stage to its next stage, or release the pipeline slot."""
+        if future is not None:
+            try:
+                next_stage = future.result()
+            except Exception as e:
+                # Stages handle their own errors; this is a bug, not a bad file
+                self.logger.error(f"Unhandled error in worker pipeline: {e}", exc_info=True)
+                next_stage = None
+            if isinstance(next_stage, Future):
+                next_stage.add_done_callback(self._stage_done)
                 return
+        self._slots.release()
+        with self._inflight_cond:
+            self._inflight -= 1
+            self._inflight_cond.notify_all()
+
+    def _then_io(self, future, stage, *args):
+        """Run stage(future, *args) on the I/O pool once future completes.
+        
+        Returns:
+            Future: Resolves to the I/O stage's own Future once it is queued.
+        """
+        queued = Future()
+        
+        def post(done):
+            try:
+                queued.set_result(self.executor.submit(stage, done, *args))
+            except RuntimeError as e:
+                queued.set_exception(e)  # Executor shut down; ends the pipeline
+        
+        future.add_done_callback(post)
+        return queued
 
-            # Step 1: Extract text
-            self.logger.info(f"Extracting text from: {filename}")
-            text = extract_text(filepath)
+    def _process_batch(self, jobs):
+        """Process a batch of files: extract on the I/O pool, then hand off.
+        
+        Text is extracted per file here; classification runs on the CPU
+        pool (through the batcher, or _classify_texts when it is disabled)
+        and moves back on the I/O pool (_finish_batch). Errors are isolated per file where possible.
+        
+        Args:
+            jobs: List of FileJob built by submit_batch().
             
-            if not text or not text.strip():
+        Returns:
+            Future or None: The next stage, or None if no file needed
+            classification.
+        """
+        start_time = time.time()
+        batch = []  # (job, text, digest)
+        
+        # Bind per-file lookups once for the loop below
+        logger = self.logger
+        try_filename_match, try_cached_result = self._try_filename_match, self._try_cached_result
+        file_digest, mark_processed = self._file_digest, self._mark_processed
+        log_error = self._log_error
+        
+        # Step 1: Extract text
+        for job in jobs:
+            filename, file_type = job.filename, job.file_type
+            try:
+                if try_filename_match(job, start_time):
+                    continue
+                
+                digest = file_digest(job.filepath)
+                if try_cached_result(job, digest, start_time):
+                    continue
+                
+                logger.info(f"Extracting text from: {filename}")
+                text = extract_text(job.filepath)
+                
+                if not text or text.isspace():
+                    elapsed = time.time() - start_time
+                    logger.warning(f"No text extracted from: {filename}")
+                    log_file_result(filename, file_type, "N/A", 0.0, "KEPT (no text)", elapsed)
+                    mark_processed(job)
+                    continue
+                
+                batch.append((job, text, digest))
+            except FileNotFoundError:
+                logger.warning(f"File no longer exists: {filename}")
+            except Exception as e:
                 elapsed = time.time() - start_time
-                self.logger.warning(f"No text extracted from: {filename}")
-                log_file_result(filename, file_type, "N/A", 0.0, "KEPT (no text)", elapsed)
-                self._mark_processed(filepath)
-                return
-            
-            # Step 2: Classify
-            category, score = self.classifier.classify(text)
-            
-            # Step 3: Decide action
-            elapsed = time.time() - start_time
-            
-            if score >= self.threshold:
-                # Move file to subject folder
-                dest = move_file(filepath, category, destination_base=self.destination_dir)
-                log_file_result(filename, file_type, category, score, "MOVED", elapsed)
-                self.logger.info(f"MOVED {filename} -> {category}/ (score={score:.4f})")
-            else:
-                # Leave in Downloads
-                log_file_result(filename, file_type, category, score, "KEPT", elapsed)
-                self.logger.info(f"KEPT {filename} in Downloads (best={category}, score={score:.4f})")
+                log_error(f"Error processing {filename}", e, filename)
+                log_file_result(filename, file_type, "ERROR", 0.0, "ERROR", elapsed, error=str(e))
+        
+        # Flush directory entries for files moved by the fast paths
+        self._sync_moved_dirs()
+        if not batch:
+            return None
+        
+        if self._batcher is not None:
+            # Shortest first, so texts sharing a batcher window have similar lengths
+            futures = [None] * len(batch)
+            for i in sorted(range(len(batch)), key=lambda i: len(batch[i][1])):
+                futures[i] = self._batcher.submit(batch[i][1])
+            classified = self._gather_classified(futures, batch, start_time)
+        else:
+            classified = self._cpu_pool.submit(self._classify_texts, batch, start_time)
+        return self._then_io(classified, self._finish_batch, batch, start_time)
+
+    def _gather_classified(self, futures, batch, start_time):
+        """Combine per-text batcher Futures into one Future of results.
+        
+        Args:
+            futures: One batcher Future per batch entry.
+            batch: List of (job, text, digest) from _process_batch().
+            start_time: time.time() when processing began.
             
-            # Mark as processed
-            self._mark_processed(filepath)
+        Returns:
+            Future: Resolves, once every text is classified, to the same
+            list _classify_texts() returns; failed files are logged here
+            and given None.
+        """
+        combined = Future()
+        remaining = [len(futures)]
+        lock = threading.Lock()
+        
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            results = []
+            for (job, _, _), future in zip(batch, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    elapsed = time.time() - start_time
+                    self._log_error(f"Error classifying {job.filename}", e, job.filename)
+                    log_file_result(job.filename, job.file_type, "ERROR", 0.0, "ERROR", elapsed, error=str(e))
+                    results.append(None)
+            combined.set_result(results)
+        
+        for future in futures:
+            future.add_done_callback(done)
+        return combined
+
+    def _classify_texts(self, batch, start_time):
+        """Classify extracted texts in length-sorted mini-batches (CPU pool).
+        
+        Texts are sorted by length and classified CLASSIFY_MINI_BATCH at a
+        time via classify_batch(), so similar-length documents share a
+        forward pass. A classifier failure marks every file in that
+        mini-batch as errored.
+        
+        Args:
+            batch: List of (job, text, digest) from _process_batch().
+            start_time: time.time() when processing began.
             
-        except Exception as e:
-            elapsed = time.time() - start_time
-            self.logger.error(f"Error processing {filename}: {e}", exc_info=True)
-            log_file_result(filename, file_type, "ERROR", 0.0, "ERROR", elapsed, error=str(e))
+        Returns:
+            list: (category, score) per batch entry, or None where
+            classification failed.
+        """
+        order = sorted(range(len(batch)), key=lambda i: len(batch[i][1]))
+        results = [None] * len(batch)
+        for start in range(0, len(order), CLASSIFY_MINI_BATCH):
+            indices = order[start:start + CLASSIFY_MINI_BATCH]
+            try:
+                mini_results = self.classifier.classify_batch([batch[i][1] for i in indices])
+            except Exception as e:
+                elapsed = time.time() - start_time
+                self._log_error(f"Error classifying batch of {len(indices)} files", e, "batch")
+                for i in indices:
+                    job = batch[i][0]
+                    log_file_result(job.filename, job.file_type, "ERROR", 0.0, "ERROR", elapsed, error=str(e))
+                continue
+            for i, result in zip(indices, mini_results):
+                results[i] = result
+        return results
 
-    def _is_already_processed(self, filepath):
-        """Check if a file has already been processed.
+    def _finish_batch(self, classified, batch, start_time):
+        """Move or keep each classified file of a batch, in submission order (I/O pool).
         
-        Compares filename and last modified time against the registry.
+        Args:
+            classified: Completed Future holding _classify_texts() results.
+            batch: List of (job, text, digest) from _process_batch().
+            start_time: time.time() when processing began.
+        """
+        logger = self.logger
+        store_result, apply_result, log_error = self._store_result, self._apply_result, self._log_error
+        try:
+            results = classified.result()
+        except Exception as e:
+            log_error(f"Error classifying batch of {len(batch)} files", e, "batch")
+            return
+        
+        for (job, _, digest), result in zip(batch, results):
+            if result is None:
+                continue
+            category, score = result
+            try:
+                store_result(job, digest, category, score)
+                apply_result(job, category, score, start_time)
+            except FileNotFoundError:
+                logger.warning(f"File no longer exists: {job.filename}")
+            except Exception as e:
+                elapsed = time.time() - start_time
+                log_error(f"Error processing {job.filename}", e, job.filename)
+                log_file_result(job.filename, job.file_type, "ERROR", 0.0, "ERROR", elapsed, error=str(e))
+        
+        # Flush directory entries once for the whole batch
+        self._sync_moved_dirs()
+
+    def _try_filename_match(self, job, start_time):
+        """Classify and move a file by its name alone, skipping extraction.
         
         Args:
-            filepath: Absolute path to the file.
+            job: FileJob being processed.
+            start_time: time.time() when processing began.
             
         Returns:
-            bool: True if file was already processed with same mtime.
+            bool: True if the filename identified a category and the file
+                  was handled; False to continue with the full pipeline.
         """
-        filename = os.path.basename(filepath)
-        if filename not in self.processed_files:
+        if not self.filename_fast_path:
             return False
+        category = self.classifier.classify_filename(job.filepath)
+        if category is None:
+            return False
+        self.logger.info(f"Filename match: {job.filename} -> {category}")
+        self._apply_result(job, category, FILENAME_MATCH_SCORE, start_time)
+        return True
+
+    def _file_digest(self, filepath):
+        """Hash a file's contents for the result cache.
         
-        try:
-            current_mtime = os.path.getmtime(filepath)
-            recorded_mtime = self.processed_files[filename]
-            return abs(current_mtime - recorded_mtime) < 1.0
-        except OSError:
+        Returns:
+            str or None: SHA-256 hex digest, or None if the cache is disabled
+            or the classifier doesn't identify its categories.
+        """
+        if self.result_cache is None or getattr(self.classifier, 'categories_key', None) is None:
+            return None
+        return file_digest(filepath)
+
+    def _try_cached_result(self, job, digest, start_time):
+        """Apply a cached classification for identical file contents.
+        
+        Args:
+            job: FileJob being processed.
+            digest: Content digest from _file_digest(), or None.
+            start_time: time.time() when processing began.
+            
+        Returns:
+            bool: True if a cached result was found and applied.
+        """
+        if digest is None:
             return False
+        cached = self.result_cache.get(digest, self.classifier.categories_key)
+        if cached is None:
+            return False
+        category, score = cached
+        self.logger.info(f"Result cache hit: {job.filename} -> {category}")
+        self._apply_result(job, category, score, start_time)
+        return True
+
+    def _store_result(self, job, digest, category, score):
+        """Record a fresh classification in the result cache."""
+        if digest is None:
+            return
+        self.result_cache.put(digest, self.classifier.categories_key, category, score)
+
+    def _apply_result(self, job, category, score, start_time):
+        """Move or keep a classified file, log the result, and mark it processed.
+        
+        Args:
+            job: FileJob being processed.
+            category: Predicted category name.
+            score: Similarity score for the predicted category.
+            start_time: time.time() when processing began.
+        """
+        filename, file_type = job.filename, job.file_type
+        elapsed = time.time() - start_time
+        
+        if score >= self.threshold:
+            # Move file to subject folder
+            dest = move_file(job.filepath, category, destination_base=self.destination_dir)
+            if self.fsync_moves:
+                with self._moved_dirs_lock:
+                    self._moved_dirs.add(os.path.dirname(dest))
+            log_file_result(filename, file_type, category, score, "MOVED", elapsed)
+            self.logger.info(f"MOVED {filename} -> {category}/ (score={score:.4f})")
+        else:
+            # Leave in Downloads
+            log_file_result(filename, file_type, category, score, "KEPT", elapsed)
+            self.logger.info(f"KEPT {filename} in Downloads (best={category}, score={score:.4f})")
+        
+        # Mark as processed
+        self._mark_processed(job)
+
+    def _log_error(self, message, e, filename):
+        """Log a processing error, with a traceback only the first time.
+        
+        Errors are grouped by exception type and file extension; repeats
+        (e.g. a burst of corrupt files of one kind) log a single line.
+        
+        Args:
+            message: Description of what failed.
+            e: The exception.
+            filename: File name (or label) whose extension groups the error.
+        """
+        key = f"{type(e).__name__}:{filename.rsplit('.', 1)[-1].lower()}"
+        with self._error_counts_lock:
+            self._error_counts[key] += 1
+            first = self._error_counts[key] == 1
+        self.logger.error(f"{message}: {e}", exc_info=first)
+
+    def _sync_moved_dirs(self):
+        """fsync every destination directory written since the last sync."""
+        if not self.fsync_moves:
+            return
+        with self._moved_dirs_lock:
+            directories, self._moved_dirs = self._moved_dirs, set()
+        if directories:
+            sync_directories(directories)
 
-    def _mark_processed(self, filepath):
+    def _is_already_processed(self, job):
+        """Check if a file has already been processed.
+        
+        Matches on device, inode and exact modification time. A hit
+        refreshes the entry's LRU position.
+        
+        Args:
+            job: FileJob for the file.
+            
+        Returns:
+            bool: True if this file was already processed unchanged.
+        """
+        st = job.st
+        entry = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        with self._registry_lock:
+            if entry not in self.processed_files:
+                return False
+            self.processed_files.move_to_end(entry)
+        return True
+
+    def _mark_processed(self, job):
         """Add a file to the processed registry.
         
+        Uses the stat taken at submit time, so the entry is correct even
+        after the file has been moved (a rename keeps the inode). The
+        entry is written to disk later by the flusher thread.
+        
         Args:
-            filepath: Absolute path to the file.
+            job: FileJob for the file.
         """
-        filename = os.path.basename(filepath)
-        try:
-            mtime = os.path.getmtime(filepath)
-        except OSError:
-            mtime = time.time()
+        st = job.st
+        entry = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        line = _dumps(entry) + b"\n"
+        processed = self.processed_files
+        with self._registry_lock:
+            processed[entry] = None
+            processed.move_to_end(entry)
+            while len(processed) > self.max_processed_entries:
+                processed.popitem(last=False)  # Evict least recently used
+            self._unflushed.append(line)
+        self._dirty.set()
+
+    def _flush_loop(self):
+        """Background thread: write queued registry entries in debounced bursts."""
+        while not self._stop.is_set():
+            self._dirty.wait()
+            self._dirty.clear()
+            # Debounce; returns early on shutdown, which flushes anyway
+            self._stop.wait(REGISTRY_FLUSH_DEBOUNCE_SECONDS)
+            with self._registry_io_lock:
+                self._flush_registry()
+
+    def _flush_registry(self):
+        """Append queued registry entries to the log, compacting if it grew too large.
         
-        self.processed_files[filename] = mtime
-        self._save_processed_files()
+        Registry files are only written from the flusher thread, by reset()
+        under _registry_io_lock, and by shutdown once the flusher has
+        stopped, so file I/O happens outside the registry lock.
+        """
+        with self._registry_lock:
+            lines, self._unflushed = self._unflushed, []
+        if not lines:
+            return
+        try:
+            with open(PROCESSED_LOG_PATH, 'ab') as f:
+                f.write(b''.join(lines))
+                log_size = f.tell()
+        except OSError as e:
+            self.logger.error(f"Could not append to processed files log: {e}")
+            return
+        if log_size > max(2 * self._snapshot_size, REGISTRY_COMPACT_MIN_BYTES):
+            self._compact()
 
     def _load_processed_files(self):
         """Load the processed files registry from disk.
         
+        Reads the snapshot (a flat list of [dev, ino, mtime_ns], least
+        recently used first), then replays the append-only log on top of
+        it. A torn last line (e.g. after a crash) is skipped, as are
+        registries in older formats.
+        
         Returns:
-            dict: Mapping of filename -> last modified timestamp.
+            OrderedDict: (st_dev, st_ino, st_mtime_ns) -> None, in LRU order.
         """
         os.makedirs(DATA_DIR, exist_ok=True)
+        processed = OrderedDict()
         if os.path.exists(PROCESSED_FILES_PATH):
             try:
-                with open(PROCESSED_FILES_PATH, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(PROCESSED_FILES_PATH, 'rb') as f:
+                    entries = _loads(f.read())
+                self._snapshot_size = os.path.getsize(PROCESSED_FILES_PATH)
+                if isinstance(entries, list):
+                    processed.update(dict.fromkeys(map(tuple, entries)))
+                else:
+                    self.logger.info("Ignoring processed files registry in an old format")
             except (json.JSONDecodeError, OSError) as e:
                 self.logger.warning(f"Could not load processed files registry: {e}")
-        return {}
+        
+        if os.path.exists(PROCESSED_LOG_PATH):
+            try:
+                with open(PROCESSED_LOG_PATH, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size:
+                        # Map the log and parse it line by line rather than
+                        # reading it into memory first
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            for line in iter(mm.readline, b''):
+                                try:
+                                    entry = _loads(line)
+                                except json.JSONDecodeError:
+                                    continue
+                                if isinstance(entry, list):
+                                    entry = tuple(entry)
+                                    processed[entry] = None
+                                    processed.move_to_end(entry)
+            except OSError as e:
+                self.logger.warning(f"Could not replay processed files log: {e}")
+        
+        while len(processed) > self.max_processed_entries:
+            processed.popitem(last=False)
+        return processed
 
     def _save_processed_files(self):
-        """Persist the processed files registry to disk."""
+        """Persist the full registry as a snapshot and clear the log."""
+        self._compact()
+
+    def _compact(self):
+        """Rewrite the snapshot from memory and truncate the log.
+        
+        Only the copy happens under the lock; serializing and writing use
+        the copy, so workers are never blocked on disk I/O. Every line
+        already in the log was applied to the registry before it was
+        written, so the copy covers the log being truncated. Lines still
+        queued are covered too and are dropped, so an entry is never in
+        both the snapshot and the log (readers can count the two by size).
+        """
+        with self._registry_lock:
+            entries = list(self.processed_files)
+            queued, self._unflushed = self._unflushed, []
         try:
-            with open(PROCESSED_FILES_PATH, 'w', encoding='utf-8') as f:
-                json.dump(self.processed_files, f, indent=2)
+            data = _dumps(entries)
+            tmp_path = PROCESSED_FILES_PATH + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                # Data must be on disk before the rename can expose it
+                f.flush()
+                os.fsync(f.fileno())
+            # Atomic swap: a crash never leaves a half-written snapshot
+            os.replace(tmp_path, PROCESSED_FILES_PATH)
+            sync_directories([DATA_DIR])  # Persist the rename itself
+            self._snapshot_size = len(data)
+            # Truncate only after the snapshot holds every logged entry
+            self._reset_log()
         except OSError as e:
             self.logger.error(f"Could not save processed files registry: {e}")
+            with self._registry_lock:
+                self._unflushed[:0] = queued  # Not in any file yet; write them to the log
+
+    def reset(self, config):
+        """Forget every processed file and pick up a new destination.
+        
+        Used when the app is pointed at new folders without restarting
+        (see src.control). Waits for in-flight files first, then empties
+        the registry in memory and on disk. Pool sizes are not changed.
+        
+        Args:
+            config: The newly loaded configuration dictionary.
+        """
+        with self._inflight_cond:
+            self._inflight_cond.wait_for(lambda: self._inflight == 0)
+        self.threshold = config.get('confidence_threshold', 0.50)
+        self.destination_dir = config.get('destination_dir', None)
+        with self._registry_lock:
+            self.processed_files.clear()
+        with self._registry_io_lock:
+            self._compact()  # Also drops queued log lines
+        self.logger.info("Processed files registry reset")
+
+    def _reset_log(self):
+        """Empty the registry log by swapping in a new file.
+        
+        A fresh file (new inode) lets readers that tail the log, such as
+        the stress test, tell a reset log from one that was appended to.
+        Truncates in place if the swap fails (e.g. the log is held open
+        on Windows).
+        """
+        tmp_path = PROCESSED_LOG_PATH + '.tmp'
+        open(tmp_path, 'wb').close()
+        try:
+            os.replace(tmp_path, PROCESSED_LOG_PATH)
+        except OSError:
+            os.remove(tmp_path)
+            open(PROCESSED_LOG_PATH, 'w').close()
 
     def shutdown(self):
         """Gracefully shut down the worker pool.
@@ -182,6 +775,21 @@ class WorkerPool:
         Waits for all queued tasks to complete before returning.
         """
         self.logger.info("Shutting down worker pool...")
+        # Later stages are queued from earlier ones, so drain whole
+        # pipelines before closing either pool
+        with self._inflight_cond:
+            self._inflight_cond.wait_for(lambda: self._inflight == 0)
+        if self._batcher is not None:
+            self._batcher.close()  # Before the CPU pool it hands batches to
         self.executor.shutdown(wait=True)
+        self._cpu_pool.shutdown(wait=True)
+        self._stop.set()
+        self._dirty.set()
+        self._flusher.join()
         self._save_processed_files()
+        repeated = {key: count for key, count in self._error_counts.items() if count > 1}
+        if repeated:
+            self.logger.info(f"Errors logged without traceback after the first: {repeated}")
+        if self.result_cache is not None:
+            self.result_cache.close()
         self.logger.info("Worker pool shut down successfully")
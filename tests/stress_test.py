@@ -16,67 +16,79 @@ Usage:
 """
 
 import argparse
+import errno
+import io
 import json
 import os
 import shutil
+import signal
+import socket
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-# ---------------------------------------------------------------------------
-# File Generators — create minimal valid files of each type
-# ---------------------------------------------------------------------------
-
-def _gen_py(path):
-    """Generate a minimal Python file."""
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(
-            '# Auto-generated test file\n'
-            'def hello():\n'
-            '    print("Hello from AutoSorter stress test")\n'
-            '\n'
-            'class Node:\n'
-            '    def __init__(self, data):\n'
-            '        self.data = data\n'
-            '        self.next = None\n'
-            '\n'
-            'if __name__ == "__main__":\n'
-            '    hello()\n'
-        )
-
-
-def _gen_c(path):
-    """Generate a minimal C file."""
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(
-            '#include <stdio.h>\n'
-            'int main() {\n'
-            '    printf("Hello from AutoSorter stress test\\n");\n'
-            '    return 0;\n'
-            '}\n'
-        )
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; --exact-count falls back to stdlib json
+    orjson = None
 
-def _gen_lex(path):
-    """Generate a minimal Lex file."""
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(
-            '%{\n'
-            '#include <stdio.h>\n'
-            '%}\n'
-            '%%\n'
-            '[a-zA-Z]+  printf("WORD ");\n'
-            '[0-9]+     printf("NUM ");\n'
-            '.          ;\n'
-            '%%\n'
-            'int main() { yylex(); return 0; }\n'
-        )
-
+# ---------------------------------------------------------------------------
+# File Generators — build minimal valid files of each type, as bytes
+# ---------------------------------------------------------------------------
 
-def _gen_ipynb(path):
-    """Generate a minimal Jupyter notebook."""
+def _gen_py():
+    """Build a minimal Python file."""
+    return (
+        '# Auto-generated test file\n'
+        'def hello():\n'
+        '    print("Hello from AutoSorter stress test")\n'
+        '\n'
+        'class Node:\n'
+        '    def __init__(self, data):\n'
+        '        self.data = data\n'
+        '        self.next = None\n'
+        '\n'
+        'if __name__ == "__main__":\n'
+        '    hello()\n'
+    ).encode('utf-8')
+
+
+def _gen_c():
+    """Build a minimal C file."""
+    return (
+        '#include <stdio.h>\n'
+        'int main() {\n'
+        '    printf("Hello from AutoSorter stress test\\n");\n'
+        '    return 0;\n'
+        '}\n'
+    ).encode('utf-8')
+
+
+def _gen_lex():
+    """Build a minimal Lex file."""
+    return (
+        '%{\n'
+        '#include <stdio.h>\n'
+        '%}\n'
+        '%%\n'
+        '[a-zA-Z]+  printf("WORD ");\n'
+        '[0-9]+     printf("NUM ");\n'
+        '.          ;\n'
+        '%%\n'
+        'int main() { yylex(); return 0; }\n'
+    ).encode('utf-8')
+
+
+def _gen_ipynb():
+    """Build a minimal Jupyter notebook."""
     nb = {
         "cells": [{
             "cell_type": "code",
@@ -92,23 +104,24 @@ def _gen_ipynb(path):
         "nbformat": 4,
         "nbformat_minor": 5,
     }
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(nb, f)
+    return json.dumps(nb).encode('utf-8')
 
 
-def _gen_docx(path):
-    """Generate a minimal .docx file."""
+def _gen_docx():
+    """Build a minimal .docx file."""
     from docx import Document
     doc = Document()
     doc.add_paragraph(
         "Reinforcement learning and Q-learning are fundamental topics in machine learning. "
         "This document discusses Markov decision processes and policy optimization."
     )
-    doc.save(path)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
 
 
-def _gen_pptx(path):
-    """Generate a minimal .pptx file."""
+def _gen_pptx():
+    """Build a minimal .pptx file."""
     from pptx import Presentation
     prs = Presentation()
     slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title + Content
@@ -118,11 +131,13 @@ def _gen_pptx(path):
         "    System.out.println(\"Hello World\");\n"
         "}\n"
     )
-    prs.save(path)
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
 
 
-def _gen_pdf(path):
-    """Generate a minimal 1-page PDF."""
+def _gen_pdf():
+    """Build a minimal 1-page PDF."""
     import fitz  # PyMuPDF
     doc = fitz.open()
     page = doc.new_page()
@@ -132,29 +147,34 @@ def _gen_pdf(path):
         "Convolutional layers, backpropagation, and gradient descent are key concepts.",
         fontsize=12,
     )
-    doc.save(path)
+    data = doc.tobytes()
     doc.close()
+    return data
 
 
-def _gen_png(path):
-    """Generate a minimal PNG with text."""
+def _gen_png():
+    """Build a minimal PNG with text."""
     from PIL import Image, ImageDraw
     img = Image.new('RGB', (200, 100), color=(255, 255, 255))
     draw = ImageDraw.Draw(img)
     draw.text((10, 30), "Stress test image", fill=(0, 0, 0))
-    img.save(path)
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
 
 
-def _gen_jpg(path):
-    """Generate a minimal JPEG with text."""
+def _gen_jpg():
+    """Build a minimal JPEG with text."""
     from PIL import Image, ImageDraw
     img = Image.new('RGB', (200, 100), color=(255, 255, 255))
     draw = ImageDraw.Draw(img)
     draw.text((10, 30), "Stress test JPEG", fill=(0, 0, 0))
-    img.save(path, format='JPEG')
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG')
+    return buf.getvalue()
 
 
-# Map of file type -> generator function
+# Map of file type -> generator function (returns the file's bytes)
 GENERATORS = {
     '.py':    _gen_py,
     '.c':     _gen_c,
@@ -170,12 +190,61 @@ GENERATORS = {
 # N values to test
 N_VALUES = [1, 5, 10, 50, 100, 250, 500, 1000, 2000, 2500, 5000, 10000]
 
+# One generated file per type, kept across runs and copied for every test file
+STRESS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.stress_cache')
+
+# Bytes requested per copy_file_range call when copying across devices
+COPY_CHUNK_BYTES = 1 << 30
+
+# App data subdirectories an isolated app shares with the real one, so
+# --parallel tests don't each export the ONNX model and encode the categories
+SHARED_APP_DATA_DIRS = ('models', 'cache')
+
+# Seconds to wait for the shared app (--reuse-app) to start and acknowledge a reset
+APP_RESET_TIMEOUT_SECONDS = 120
+
+# Registry polling fallback in wait_for_processing: first interval, cap, growth
+POLL_MIN_SECONDS = 0.01
+POLL_MAX_SECONDS = 0.5
+POLL_BACKOFF = 1.5
+
+# Resolution of saved graphs (--high-dpi selects the larger one)
+GRAPH_DPI = 100
+GRAPH_HIGH_DPI = 150
+
 
 # ---------------------------------------------------------------------------
 # Test Config Generator
 # ---------------------------------------------------------------------------
 
-def create_test_config(source_dir, dest_dir, mock_mode, project_root):
+# Settings shared by every stress-test run; create_test_config fills in
+# the per-run placeholders
+_CONFIG_TEMPLATE = {
+    "source_dir": "@SOURCE_DIR@",
+    "destination_dir": "@DEST_DIR@",
+    "scan_existing_on_startup": True,
+    "confidence_threshold": 0.50,
+    "max_file_size_mb": 100,
+    "worker_threads": 4,  # Use 4 threads for stress testing
+    "model_name": "all-MiniLM-L6-v2",
+    "watch_delay_seconds": 0,  # No delay for speed
+    "ocr_max_pages": 1,
+    "code_max_lines": 50,
+    "log_max_bytes": 52428800,  # 50MB log for stress test
+    "log_backup_count": 1,
+    "ignored_extensions": [".crdownload", ".tmp", ".part", ".partial"],
+    "mock_classifier": "@MOCK@",  # Custom flag for mock mode
+    # Every test file is a copy of one template: the result cache and the
+    # filename shortcut would skip extraction and classification
+    "result_cache": False,
+    "filename_fast_path": False,
+}
+
+# The template serialized once; runs only substitute the placeholders
+_CONFIG_TEMPLATE_JSON = json.dumps(_CONFIG_TEMPLATE, indent=2)
+
+
+def create_test_config(source_dir, dest_dir, mock_mode, project_root, tag=''):
     """Create a temporary config.json for the stress test.
 
     Args:
@@ -183,30 +252,21 @@ def create_test_config(source_dir, dest_dir, mock_mode, project_root):
         dest_dir: Temp directory for output (fake Subjects).
         mock_mode: If True, sets a flag the app can use to skip classification.
         project_root: Path to the project root.
+        tag: Suffix for the file name, so concurrent tests don't share a config.
 
     Returns:
         Path to the generated config file.
     """
-    config = {
-        "source_dir": source_dir,
-        "destination_dir": dest_dir,
-        "scan_existing_on_startup": True,
-        "confidence_threshold": 0.50,
-        "max_file_size_mb": 100,
-        "worker_threads": 4,  # Use 4 threads for stress testing
-        "model_name": "all-MiniLM-L6-v2",
-        "watch_delay_seconds": 0,  # No delay for speed
-        "ocr_max_pages": 1,
-        "code_max_lines": 50,
-        "log_max_bytes": 52428800,  # 50MB log for stress test
-        "log_backup_count": 1,
-        "ignored_extensions": [".crdownload", ".tmp", ".part", ".partial"],
-        "mock_classifier": mock_mode,  # Custom flag for mock mode
-    }
+    config_json = (
+        _CONFIG_TEMPLATE_JSON
+        .replace('"@SOURCE_DIR@"', json.dumps(source_dir))
+        .replace('"@DEST_DIR@"', json.dumps(dest_dir))
+        .replace('"@MOCK@"', json.dumps(bool(mock_mode)))
+    )
 
-    config_path = os.path.join(project_root, 'config', 'config_stress_test.json')
+    config_path = os.path.join(project_root, 'config', f'config_stress_test{tag}.json')
     with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2)
+        f.write(config_json)
 
     return config_path
 
@@ -215,79 +275,458 @@ def create_test_config(source_dir, dest_dir, mock_mode, project_root):
 # File Generation
 # ---------------------------------------------------------------------------
 
+def _ensure_template(ext):
+    """Return the path of the cached template file for a type, creating it once.
+
+    Every generated file of a type is identical, so the generator runs
+    only when tests/.stress_cache has no template for the extension yet
+    (delete the directory after changing a generator).
+    """
+    path = os.path.join(STRESS_CACHE_DIR, f'template{ext}')
+    if not os.path.exists(path):
+        os.makedirs(STRESS_CACHE_DIR, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(GENERATORS[ext]())
+        os.replace(tmp_path, path)  # Atomic, so concurrent tests never see a partial file
+    return path
+
+
 def generate_files(staging_dir, ext, n):
     """Generate N files of the given extension in the staging directory.
 
+    Each file is a copy of the cached template. Copies rather than hard
+    links are needed: the app identifies files by inode, so links would
+    all look like one already-processed file.
+
     Args:
         staging_dir: Directory to create files in.
         ext: File extension (e.g., '.py').
         n: Number of files to create.
     """
-    gen_func = GENERATORS[ext]
+    template_path = _ensure_template(ext)
     for i in range(n):
-        fname = f"stress_test_{i:05d}{ext}"
-        fpath = os.path.join(staging_dir, fname)
-        gen_func(fpath)
+        _fast_copy(template_path, os.path.join(staging_dir, f"stress_test_{i:05d}{ext}"))
 
 
 # ---------------------------------------------------------------------------
 # Core Test Runner
 # ---------------------------------------------------------------------------
 
-def wait_for_processing(processed_path, expected_count, timeout=600):
-    """Wait until processed_files.json shows the expected count.
+class _SpawnedProcess:
+    """Minimal Popen stand-in for a child started with os.posix_spawn.
+
+    posix_spawn avoids fork()'s copy of this (large) harness process. It
+    has no cwd argument, so the project root is put on PYTHONPATH for
+    `python -m src.main` instead. With no log_fd the child's stdout and
+    stderr go to os.devnull.
+    """
+
+    def __init__(self, cmd, project_root, log_fd=None, env=None):
+        env = dict(os.environ if env is None else env)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [project_root, env.get('PYTHONPATH')]))
+        if log_fd is None:
+            stdout_action = (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0)
+        else:
+            stdout_action = (os.POSIX_SPAWN_DUP2, log_fd, 1)
+        self.returncode = None
+        self.pid = os.posix_spawn(
+            cmd[0], cmd, env,
+            file_actions=[
+                stdout_action,
+                (os.POSIX_SPAWN_DUP2, 1, 2),  # Merge stderr into stdout
+            ],
+        )
+
+    def poll(self):
+        """Return the exit code, or None if the child is still running."""
+        if self.returncode is None:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid:
+                # Same convention as Popen: negative signal number if killed
+                self.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        """Wait for the child to exit.
+
+        Raises:
+            subprocess.TimeoutExpired: If it is still running after timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(self.pid, timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+    def terminate(self):
+        """Ask the child to exit (SIGTERM)."""
+        if self.poll() is None:
+            os.kill(self.pid, signal.SIGTERM)
+
+    def kill(self):
+        """Force the child to exit (SIGKILL)."""
+        if self.poll() is None:
+            os.kill(self.pid, signal.SIGKILL)
+
+
+def _fast_copy(src, dst):
+    """Copy a file's contents without its metadata, in-kernel where possible.
+
+    Uses os.copy_file_range on Linux; elsewhere shutil.copyfile, which
+    picks the platform's fast copy. The copystat step of shutil.copy2 is
+    skipped since the test files are throwaway.
+    """
+    copy_range = getattr(os, 'copy_file_range', None)
+    if copy_range is None:
+        shutil.copyfile(src, dst)
+        return
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            while copy_range(fsrc.fileno(), fdst.fileno(), COPY_CHUNK_BYTES):
+                pass
+        except OSError:
+            # Kernel or filesystem doesn't support it (e.g. older kernels
+            # across devices); fall back to a plain copy from the start
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst)
+
+
+def _seed_app_data(app_data_root):
+    """Point an isolated app data dir at the real one's models and caches.
+
+    Each of SHARED_APP_DATA_DIRS that exists under the real LOCALAPPDATA is
+    linked into app_data_root (copied where symlinks aren't permitted), so
+    the isolated app only gets its own registry and logs.
+    """
+    real_root = os.path.join(
+        os.environ.get('LOCALAPPDATA', os.path.join(os.path.expanduser('~'), 'AppData', 'Local')),
+        'AutoSorter',
+    )
+    isolated_root = os.path.join(app_data_root, 'AutoSorter')
+    os.makedirs(isolated_root, exist_ok=True)
+    for name in SHARED_APP_DATA_DIRS:
+        src = os.path.join(real_root, name)
+        if not os.path.isdir(src):
+            continue
+        dst = os.path.join(isolated_root, name)
+        try:
+            os.symlink(src, dst, target_is_directory=True)
+        except OSError:
+            shutil.copytree(src, dst)
+
+
+def _start_app(cmd, project_root, log_file, env=None):
+    """Start the app subprocess with output to log_file, or discarded if None."""
+    if hasattr(os, 'posix_spawn'):
+        return _SpawnedProcess(cmd, project_root, log_file.fileno() if log_file else None, env)
+    return subprocess.Popen(
+        cmd,
+        cwd=project_root,
+        env=env,
+        stdout=log_file or subprocess.DEVNULL,
+        stderr=subprocess.STDOUT,  # Merge stderr into stdout
+        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+    )
+
+
+class _SharedApp:
+    """One app subprocess reused by every test through its control socket.
+
+    The app is started on the first reset() with --ipc-socket; each test
+    then sends a "reset" command naming its config file, which makes the
+    app clear its registry and watch the new folders without reloading
+    the classifier. If the app can't be reached that way, reset() returns
+    False and the tests fall back to one subprocess each.
+    """
+
+    def __init__(self, project_root, capture_logs=False):
+        self.project_root = project_root
+        self.temp_dir = tempfile.mkdtemp(prefix='autosorter_app_')
+        self.socket_path = os.path.join(self.temp_dir, 'control.sock')
+        self.log_path = os.path.join(self.temp_dir, 'subprocess.log')
+        self.log_file = open(self.log_path, 'w', encoding='utf-8') if capture_logs else None
+        self.proc = None
+        self.supported = True
+
+    def reset(self, config_path, timeout=APP_RESET_TIMEOUT_SECONDS):
+        """Point the app at a test's config, starting the app on first use.
+
+        Returns:
+            True if the app acknowledged the reset, False to fall back.
+        """
+        if not self.supported:
+            return False
+        if self.proc is None:
+            cmd = [sys.executable, '-m', 'src.main', '--config', config_path, '--ipc-socket', self.socket_path]
+            self.proc = _start_app(cmd, self.project_root, self.log_file)
+
+        request = json.dumps({'cmd': 'reset', 'config': config_path}).encode('utf-8') + b'\n'
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(max(1.0, deadline - time.monotonic()))
+                    sock.connect(self.socket_path)
+                    sock.sendall(request)
+                    with sock.makefile('rb') as reader:
+                        reply = json.loads(reader.readline() or b'{}')
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                # Not listening yet (still loading) or never will (no IPC support)
+                if self.proc.poll() is not None or time.monotonic() > deadline:
+                    reply = {'error': 'app exited or never opened its control socket'}
+                    break
+                time.sleep(0.1)
+            except (OSError, ValueError) as e:
+                reply = {'error': str(e)}
+                break
+
+        if reply.get('ok'):
+            return True
+        print(f"\n  Shared app unavailable ({reply.get('error')}); starting one app per test")
+        self.supported = False
+        self.close()
+        return False
+
+    def close(self):
+        """Stop the app and remove its temp directory."""
+        if self.proc is not None:
+            try:
+                self.proc.terminate()
+                self.proc.wait(timeout=10)
+            except Exception:
+                try:
+                    self.proc.kill()
+                except Exception:
+                    pass
+            self.proc = None
+        if self.log_file and not self.log_file.closed:
+            self.log_file.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def count_processed(processed_path, exact=False):
+    """Count registry entries in the snapshot plus its append-only log.
+
+    The app never keeps an entry in both files, so by default the count
+    is taken from raw bytes without parsing: the snapshot is a flat JSON
+    list of [dev, ino, mtime_ns] lists (one '[' each, plus the outer one)
+    and the log holds one entry per complete line.
+
+    Args:
+        processed_path: Path to the processed_files.json snapshot.
+        exact: If True, parse both files and count distinct entries instead.
+
+    Returns:
+        Number of processed entries.
+    """
+    if exact:
+        return _count_processed_exact(processed_path)
+    count = 0
+    if os.path.exists(processed_path):
+        with open(processed_path, 'rb') as f:
+            data = f.read()
+        if data:
+            count += data.count(b'[') - 1
+    log_path = processed_path + '.log'
+    if os.path.exists(log_path):
+        with open(log_path, 'rb') as f:
+            count += f.read().count(b'\n')  # A line still being written has no newline yet
+    return count
+
+
+def _count_processed_exact(processed_path):
+    """Parse the snapshot and log and count distinct entries (orjson if available)."""
+    loads = orjson.loads if orjson is not None else json.loads
+    entries = set()
+    if os.path.exists(processed_path):
+        with open(processed_path, 'rb') as f:
+            data = f.read()
+        if data:
+            entries.update(map(tuple, loads(data)))
+    log_path = processed_path + '.log'
+    if os.path.exists(log_path):
+        with open(log_path, 'rb') as f:
+            lines = f.read().split(b'\n')
+        for line in lines[:-1]:  # The last piece is empty or still being written
+            entries.add(tuple(loads(line)))
+    return len(entries)
+
+
+class _RegistryChangeHandler(FileSystemEventHandler):
+    """Sets an Event whenever the registry snapshot or its log changes."""
+
+    def __init__(self, processed_path, changed):
+        self.processed_path = processed_path
+        self.changed = changed
+
+    def on_any_event(self, event):
+        # Covers writes to the log and the snapshot's tmp -> final rename
+        paths = (event.src_path, getattr(event, 'dest_path', '') or '')
+        if any(p.startswith(self.processed_path) for p in paths):
+            self.changed.set()
+
+
+def _registry_signature(processed_path):
+    """Return (inode, size, mtime_ns) of the registry snapshot and its log.
+
+    A cheap os.stat per file that changes whenever either file is
+    rewritten, appended to or replaced; missing files give None.
+    """
+    sig = []
+    for path in (processed_path, processed_path + '.log'):
+        try:
+            st = os.stat(path)
+        except OSError:
+            sig.append(None)
+        else:
+            sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+    return tuple(sig)
+
+
+class _RegistryTail:
+    """Counts registry entries incrementally while the app runs.
+
+    The log is append-only JSONL, so each call reads only the bytes
+    appended since the previous one and adds their newlines. When the app
+    compacts, it replaces the snapshot and then swaps in an empty log (a
+    new inode): the snapshot is re-counted only when it changes, and the
+    log is counted afresh only once its inode changes, so entries are not
+    counted twice in between.
+    """
+
+    def __init__(self, processed_path):
+        self.processed_path = processed_path
+        self.log_path = processed_path + '.log'
+        self._snapshot_sig = None
+        self._snapshot_count = 0
+        self._log_ino = None
+        self._log_offset = 0
+        self._log_lines = 0
+
+    def count(self, sig):
+        """Return the entry count given a fresh _registry_signature()."""
+        snapshot_sig, log_sig = sig
+        log_ino, log_size = (log_sig[0], log_sig[1]) if log_sig is not None else (None, 0)
+
+        if snapshot_sig != self._snapshot_sig:
+            data = b''
+            if snapshot_sig is not None:
+                with open(self.processed_path, 'rb') as f:
+                    data = f.read()
+            self._snapshot_sig = snapshot_sig  # Only once read, so a failed read is retried
+            self._snapshot_count = data.count(b'[') - 1 if data else 0
+            if log_ino is not None and log_ino == self._log_ino:
+                # Log not swapped yet: everything in it is now in the snapshot
+                self._log_offset, self._log_lines = log_size, 0
+
+        if log_ino != self._log_ino:
+            self._log_ino = log_ino
+            self._log_offset = self._log_lines = 0
+        elif log_size < self._log_offset:
+            self._log_offset = self._log_lines = 0  # Truncated in place
+        if log_size > self._log_offset:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                appended = f.read()
+            self._log_offset += len(appended)
+            self._log_lines += appended.count(b'\n')  # A line still being written has no newline yet
+        return self._snapshot_count + self._log_lines
+
+
+def wait_for_processing(processed_path, expected_count, timeout=600, exact=False):
+    """Wait until the processed registry shows the expected count.
+
+    Sleeps on filesystem events for the registry's folder, with a polling
+    fallback that backs off from POLL_MIN_SECONDS to POLL_MAX_SECONDS and
+    resets on progress, in case an event is missed. The registry is only
+    re-counted when a stat shows the snapshot or log actually changed, and
+    then only the newly appended part of the log is read (_RegistryTail).
 
     Args:
         processed_path: Path to the processed_files.json.
         expected_count: Number of files we expect to be processed.
         timeout: Max seconds to wait.
+        exact: If True, count by parsing the registry (see count_processed).
 
     Returns:
         Tuple of (actual_count, timed_out).
     """
     start = time.time()
+    deadline = start + timeout
     last_count = 0
-    stall_start = None
+    last_progress = start
+    last_sig = None
+    delay = POLL_MIN_SECONDS
+    tail = _RegistryTail(processed_path)
     stall_timeout = 60  # If no progress for 60s, consider it done
 
-    while time.time() - start < timeout:
-        try:
-            if os.path.exists(processed_path):
-                with open(processed_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                count = len(data)
-            else:
-                count = 0
-        except (json.JSONDecodeError, OSError):
-            count = last_count
-
-        if count >= expected_count:
-            return count, False
-
-        # Detect stall
-        if count > last_count:
-            last_count = count
-            stall_start = time.time()
-        elif stall_start and (time.time() - stall_start > stall_timeout):
-            # No progress for stall_timeout seconds, assume done
-            return count, True
-
-        time.sleep(0.5)
+    registry_dir = os.path.dirname(processed_path)
+    os.makedirs(registry_dir, exist_ok=True)
+    changed = threading.Event()
+    observer = Observer()
+    observer.schedule(_RegistryChangeHandler(processed_path, changed), registry_dir, recursive=False)
+    observer.start()
+    try:
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return last_count, True
+            changed.wait(timeout=min(remaining, delay))
+            changed.clear()
+
+            sig = _registry_signature(processed_path)
+            if sig == last_sig:
+                delay = min(POLL_MAX_SECONDS, delay * POLL_BACKOFF)
+                if not last_count:
+                    last_progress = time.time()  # Nothing yet; keep waiting until the deadline
+                elif time.time() - last_progress >= stall_timeout:
+                    # No progress for stall_timeout seconds, assume done
+                    return last_count, True
+                continue
+            last_sig = sig
 
-    return last_count, True
+            try:
+                count = count_processed(processed_path, True) if exact else tail.count(sig)
+            except (json.JSONDecodeError, OSError):
+                count = last_count
+
+            if count >= expected_count:
+                return count, False
+            if count > last_count:
+                last_count = count
+                last_progress = time.time()
+                delay = POLL_MIN_SECONDS
+    finally:
+        observer.stop()
+        observer.join()
 
 
-def run_single_test(ext, n, mock_mode, project_root):
+def run_single_test(ext, n, mock_mode, project_root, isolated=False, capture_logs=False, app=None,
+                    exact_count=False):
     """Run a single stress test: N files of type ext.
 
     Launches the app as a subprocess, drops files, waits for processing,
-    and measures throughput. Subprocess output goes to a log file for debugging.
+    and measures throughput. Subprocess output is discarded unless
+    capture_logs is set, in which case it goes to a log file for debugging.
 
     Args:
         ext: File extension.
         n: Number of files.
         mock_mode: Whether to use the mock classifier.
         project_root: Path to the project root.
+        isolated: If True, give the app its own LOCALAPPDATA under the temp
+                  directory, so tests can run concurrently. Its registry and
+                  logs are separate; models and caches are shared (see
+                  _seed_app_data).
+        capture_logs: If True, keep the app's stdout/stderr in subprocess.log
+                      and show its tail when the app fails or times out.
+        app: Optional _SharedApp to reuse instead of starting a new app.
+        exact_count: If True, count processed files by parsing the registry.
 
     Returns:
         Dict with test results.
@@ -298,10 +737,14 @@ def run_single_test(ext, n, mock_mode, project_root):
     dest_dir = os.path.join(temp_base, 'subjects')
     staging_dir = os.path.join(temp_base, 'staging')
     subprocess_log = os.path.join(temp_base, 'subprocess.log')
-    processed_path = os.path.join(
-        os.environ.get('LOCALAPPDATA', os.path.join(os.path.expanduser('~'), 'AppData', 'Local')),
-        'AutoSorter', 'processed_files.json'
-    )
+    if isolated:
+        app_data_root = os.path.join(temp_base, 'appdata')
+        env = dict(os.environ, LOCALAPPDATA=app_data_root)
+        _seed_app_data(app_data_root)
+    else:
+        app_data_root = os.environ.get('LOCALAPPDATA', os.path.join(os.path.expanduser('~'), 'AppData', 'Local'))
+        env = None  # Inherit the harness environment
+    processed_path = os.path.join(app_data_root, 'AutoSorter', 'processed_files.json')
 
     os.makedirs(source_dir)
     os.makedirs(dest_dir)
@@ -322,6 +765,8 @@ def run_single_test(ext, n, mock_mode, project_root):
 
     proc = None
     log_file = None
+    config_path = None
+    reused = False
 
     try:
         # Step 1: Generate files in staging
@@ -332,57 +777,73 @@ def run_single_test(ext, n, mock_mode, project_root):
         print(f"done ({result['gen_time']:.2f}s)")
 
         # Step 2: Create test config
-        config_path = create_test_config(source_dir, dest_dir, mock_mode, project_root)
-
-        # Step 3: Clear processed files registry
-        if os.path.exists(processed_path):
-            os.remove(processed_path)
-
-        # Step 4: Start the app as subprocess — output to log file
-        log_file = open(subprocess_log, 'w', encoding='utf-8')
-        cmd = [sys.executable, '-m', 'src.main', '--config', config_path]
-        
-        print(f"  Starting AutoSorter (mode={'mock' if mock_mode else 'real'})...", end=' ', flush=True)
-        proc = subprocess.Popen(
-            cmd,
-            cwd=project_root,
-            stdout=log_file,
-            stderr=subprocess.STDOUT,  # Merge stderr into log
-            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+        config_path = create_test_config(
+            source_dir, dest_dir, mock_mode, project_root,
+            tag=f"_{os.getpid()}_{ext.lstrip('.')}_{n}",
         )
 
-        # Wait for startup and verify the process is alive
-        startup_wait = 3 if mock_mode else 10
-        time.sleep(startup_wait)
+        # Step 3: Clear processed files registry (snapshot and log)
+        for path in (processed_path, processed_path + '.log'):
+            if os.path.exists(path):
+                os.remove(path)
 
-        if proc.poll() is not None:
+        # Step 4: Start the app as subprocess (or reset the shared one) —
+        # output to a log file or discarded
+        print(f"  Starting AutoSorter (mode={'mock' if mock_mode else 'real'})...", end=' ', flush=True)
+        reused = app is not None and app.reset(config_path)
+        if reused:
+            log_file, subprocess_log = app.log_file, app.log_path
+            print("running (shared app)")
+        else:
+            if capture_logs:
+                log_file = open(subprocess_log, 'w', encoding='utf-8')
+            cmd = [sys.executable, '-m', 'src.main', '--config', config_path]
+            proc = _start_app(cmd, project_root, log_file, env)
+
+            # Wait for startup and verify the process is alive
+            startup_wait = 3 if mock_mode else 10
+            time.sleep(startup_wait)
+
+        if proc is not None and proc.poll() is not None:
             # Process has already exited — read the log for the error
-            log_file.close()
-            log_file = None
-            with open(subprocess_log, 'r', encoding='utf-8') as f:
-                error_output = f.read()
             result['error'] = f"Subprocess exited (code={proc.returncode})"
             print(f"FAILED (exit code {proc.returncode})")
-            print(f"  Subprocess output:\n{error_output[:500]}")
+            if log_file:
+                log_file.close()
+                log_file = None
+                with open(subprocess_log, 'r', encoding='utf-8') as f:
+                    error_output = f.read()
+                print(f"  Subprocess output:\n{error_output[:500]}")
+            else:
+                print("  (rerun with --capture-logs to see the subprocess output)")
             return result
 
-        print("running")
+        if not reused:
+            print("running")
 
-        # Step 5: Copy all files from staging to source (simulates download burst)
+        # Step 5: Move all files from staging to source (simulates download burst).
+        # Both live under temp_base, so a rename moves each file without
+        # copying its bytes; fall back to copying if they are on different devices.
         print(f"  Dropping {n} files into source dir...", end=' ', flush=True)
         drop_start = time.time()
-        for fname in os.listdir(staging_dir):
-            shutil.copy2(
-                os.path.join(staging_dir, fname),
-                os.path.join(source_dir, fname),
-            )
+        drop_file = os.replace
+        with os.scandir(staging_dir) as entries:
+            for entry in entries:
+                dst = os.path.join(source_dir, entry.name)
+                try:
+                    drop_file(entry.path, dst)
+                except OSError as e:
+                    if e.errno != errno.EXDEV or drop_file is _fast_copy:
+                        raise
+                    drop_file = _fast_copy
+                    drop_file(entry.path, dst)
         drop_time = time.time() - drop_start
         print(f"done ({drop_time:.2f}s)")
 
         # Step 6: Wait for processing to complete
         print(f"  Waiting for {n} files to be processed...", flush=True)
         process_start = time.time()
-        processed_count, timed_out = wait_for_processing(processed_path, n, timeout=600)
+        processed_count, timed_out = wait_for_processing(processed_path, n, timeout=600, exact=exact_count)
         process_time = time.time() - process_start
 
         result['total_time'] = drop_time + process_time
@@ -400,7 +861,7 @@ def run_single_test(ext, n, mock_mode, project_root):
         )
 
         # If timed out, show subprocess log tail for debugging
-        if timed_out:
+        if timed_out and log_file:
             log_file.flush()
             try:
                 with open(subprocess_log, 'r', encoding='utf-8') as f:
@@ -415,8 +876,8 @@ def run_single_test(ext, n, mock_mode, project_root):
         print(f"  ERROR: {e}")
 
     finally:
-        # Step 7: Close log file
-        if log_file and not log_file.closed:
+        # Step 7: Close log file (a shared app keeps its own open)
+        if log_file and not log_file.closed and not reused:
             log_file.close()
 
         # Step 8: Kill the app
@@ -438,9 +899,8 @@ def run_single_test(ext, n, mock_mode, project_root):
 
         # Clean up test config
         try:
-            cfg = os.path.join(project_root, 'config', 'config_stress_test.json')
-            if os.path.exists(cfg):
-                os.remove(cfg)
+            if config_path and os.path.exists(config_path):
+                os.remove(config_path)
         except Exception:
             pass
 
@@ -458,9 +918,9 @@ def print_results_table(results):
     print("=" * 90)
 
     # Group by extension
-    by_ext = {}
+    by_ext = defaultdict(list)
     for r in results:
-        by_ext.setdefault(r['ext'], []).append(r)
+        by_ext[r['ext']].append(r)
 
     for ext, ext_results in by_ext.items():
         print(f"\n--- {ext} ({ext_results[0]['mode']} mode) ---")
@@ -508,7 +968,7 @@ TYPE_COLORS = {
 }
 
 
-def plot_graphs(results, project_root):
+def plot_graphs(results, project_root, dpi=GRAPH_DPI):
     """Generate 4 graph images (2 subplots each) from stress test results.
 
     Saves to tests/graphs/ directory.
@@ -516,12 +976,14 @@ def plot_graphs(results, project_root):
     Args:
         results: List of result dicts from test runs.
         project_root: Path to the project root.
+        dpi: Resolution of the saved PNGs.
     """
     try:
         import matplotlib
         matplotlib.use('Agg')  # Non-interactive backend
         import matplotlib.pyplot as plt
         import matplotlib.ticker as ticker
+        import numpy as np
     except ImportError:
         print("\n⚠ matplotlib not installed — skipping graph generation.")
         print("  Install with: pip install matplotlib")
@@ -534,14 +996,32 @@ def plot_graphs(results, project_root):
     mode_label = "Mock (System Only)" if mode == 'mock' else "Real (Full Pipeline)"
 
     # Group by extension
-    by_ext = {}
+    by_ext = defaultdict(list)
     for r in results:
         if r['error'] is None:
-            by_ext.setdefault(r['ext'], []).append(r)
+            by_ext[r['ext']].append(r)
 
-    # Sort each group by N
-    for ext in by_ext:
-        by_ext[ext].sort(key=lambda x: x['n'])
+    # Sort each group by N and derive every plotted series once
+    grouped = {}
+    for ext, data in by_ext.items():
+        data.sort(key=lambda x: x['n'])
+        n = np.array([d['n'] for d in data], dtype=float)
+        fps = np.array([d['files_per_sec'] for d in data], dtype=float)
+        process_time = np.array([d['process_time'] for d in data], dtype=float)
+        processed = np.array([d['processed_count'] for d in data], dtype=float)
+        grouped[ext] = {
+            'n': n,
+            'fps': fps,
+            'time': process_time,
+            'tpf': np.divide(process_time, processed, out=np.zeros_like(process_time), where=processed > 0),
+            # Files/sec relative to the smallest N; None when the baseline is zero
+            'eff': fps / fps[0] * 100 if fps[0] > 0 else None,
+            'success': np.divide(processed * 100, n, out=np.zeros_like(n), where=n > 0),
+            'gen': np.array([d['gen_time'] for d in data], dtype=float),
+        }
+
+    # N values every type has a result for, ascending
+    common_ns = sorted(set.intersection(*({d['n'] for d in data} for data in by_ext.values()))) if by_ext else []
 
     plt.rcParams.update({
         'figure.facecolor': '#1a1a2e',
@@ -559,23 +1039,22 @@ def plot_graphs(results, project_root):
         'font.size': 10,
         'axes.titlesize': 13,
         'axes.titleweight': 'bold',
+        'path.simplify_threshold': 1.0,
     })
 
     # ── Graph 1: Throughput + Total Time ──────────────────────────────────
+    # One figure is reused for all four graphs; axes are cleared in between
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
     fig.suptitle(f'AutoSorter Performance — {mode_label}', fontsize=16, fontweight='bold', y=0.98)
 
-    for ext, data in by_ext.items():
-        ns = [d['n'] for d in data]
+    for ext, g in grouped.items():
         color = TYPE_COLORS.get(ext, '#ffffff')
 
         # Left: Throughput (files/sec)
-        fps = [d['files_per_sec'] for d in data]
-        ax1.plot(ns, fps, 'o-', label=ext, color=color, markersize=5, linewidth=2)
+        ax1.plot(g['n'], g['fps'], 'o-', label=ext, color=color, markersize=5, linewidth=2)
 
         # Right: Total time
-        times = [d['process_time'] for d in data]
-        ax2.plot(ns, times, 's-', label=ext, color=color, markersize=5, linewidth=2)
+        ax2.plot(g['n'], g['time'], 's-', label=ext, color=color, markersize=5, linewidth=2)
 
     ax1.set_xlabel('Number of Files (N)')
     ax1.set_ylabel('Throughput (files/sec)')
@@ -594,27 +1073,23 @@ def plot_graphs(results, project_root):
 
     plt.tight_layout(rect=[0, 0, 1, 0.94])
     path1 = os.path.join(graphs_dir, 'throughput_and_time.png')
-    fig.savefig(path1, dpi=150, bbox_inches='tight')
-    plt.close(fig)
+    fig.savefig(path1, dpi=dpi, bbox_inches='tight')
     print(f"  Saved: {path1}")
 
     # ── Graph 2: Per-file Time + Scaling Efficiency ───────────────────────
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    for ax in (ax1, ax2):
+        ax.clear()
     fig.suptitle(f'Per-File Performance — {mode_label}', fontsize=16, fontweight='bold', y=0.98)
 
-    for ext, data in by_ext.items():
-        ns = [d['n'] for d in data]
+    for ext, g in grouped.items():
         color = TYPE_COLORS.get(ext, '#ffffff')
 
         # Left: Time per file
-        tpf = [d['process_time'] / d['processed_count'] if d['processed_count'] > 0 else 0 for d in data]
-        ax1.plot(ns, tpf, 'o-', label=ext, color=color, markersize=5, linewidth=2)
+        ax1.plot(g['n'], g['tpf'], 'o-', label=ext, color=color, markersize=5, linewidth=2)
 
         # Right: Scaling efficiency (files/sec relative to N=smallest)
-        if data[0]['files_per_sec'] > 0:
-            baseline = data[0]['files_per_sec']
-            efficiency = [d['files_per_sec'] / baseline * 100 for d in data]
-            ax2.plot(ns, efficiency, 's-', label=ext, color=color, markersize=5, linewidth=2)
+        if g['eff'] is not None:
+            ax2.plot(g['n'], g['eff'], 's-', label=ext, color=color, markersize=5, linewidth=2)
 
     ax1.set_xlabel('Number of Files (N)')
     ax1.set_ylabel('Time per File (seconds)')
@@ -633,28 +1108,23 @@ def plot_graphs(results, project_root):
 
     plt.tight_layout(rect=[0, 0, 1, 0.94])
     path2 = os.path.join(graphs_dir, 'per_file_and_scaling.png')
-    fig.savefig(path2, dpi=150, bbox_inches='tight')
-    plt.close(fig)
+    fig.savefig(path2, dpi=dpi, bbox_inches='tight')
     print(f"  Saved: {path2}")
 
     # ── Graph 3: Type Comparison Bars ─────────────────────────────────────
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    for ax in (ax1, ax2):
+        ax.clear()
     fig.suptitle(f'File Type Comparison — {mode_label}', fontsize=16, fontweight='bold', y=0.98)
 
-    # Find the largest N that all types have in common
-    all_ns = set.intersection(*[set(d['n'] for d in data) for data in by_ext.values()]) if by_ext else set()
-    if all_ns:
-        max_n = max(all_ns)
-        mid_n = sorted(all_ns)[len(all_ns) // 2]  # Median N
+    # Compare types at the largest N they all have in common
+    if common_ns:
+        max_n = common_ns[-1]
 
         # Left: Throughput bar at max N
-        exts_sorted = sorted(by_ext.keys())
-        throughputs = []
-        colors = []
-        for ext in exts_sorted:
-            match = [d for d in by_ext[ext] if d['n'] == max_n]
-            throughputs.append(match[0]['files_per_sec'] if match else 0)
-            colors.append(TYPE_COLORS.get(ext, '#ffffff'))
+        exts_sorted = sorted(grouped.keys())
+        at_max = [np.flatnonzero(grouped[ext]['n'] == max_n)[0] for ext in exts_sorted]
+        throughputs = [grouped[ext]['fps'][i] for ext, i in zip(exts_sorted, at_max)]
+        colors = [TYPE_COLORS.get(ext, '#ffffff') for ext in exts_sorted]
 
         bars1 = ax1.bar(exts_sorted, throughputs, color=colors, edgecolor='#e0e0e0', linewidth=0.5)
         ax1.set_xlabel('File Type')
@@ -667,10 +1137,7 @@ def plot_graphs(results, project_root):
                      f'{val:.1f}', ha='center', va='bottom', fontsize=9, color='#e0e0e0')
 
         # Right: Processing time bar at max N
-        proc_times = []
-        for ext in exts_sorted:
-            match = [d for d in by_ext[ext] if d['n'] == max_n]
-            proc_times.append(match[0]['process_time'] if match else 0)
+        proc_times = [grouped[ext]['time'][i] for ext, i in zip(exts_sorted, at_max)]
 
         bars2 = ax2.bar(exts_sorted, proc_times, color=colors, edgecolor='#e0e0e0', linewidth=0.5)
         ax2.set_xlabel('File Type')
@@ -688,25 +1155,22 @@ def plot_graphs(results, project_root):
 
     plt.tight_layout(rect=[0, 0, 1, 0.94])
     path3 = os.path.join(graphs_dir, 'type_comparison.png')
-    fig.savefig(path3, dpi=150, bbox_inches='tight')
-    plt.close(fig)
+    fig.savefig(path3, dpi=dpi, bbox_inches='tight')
     print(f"  Saved: {path3}")
 
     # ── Graph 4: Generation Time + Success Rate ──────────────────────────
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    for ax in (ax1, ax2):
+        ax.clear()
     fig.suptitle(f'System Health — {mode_label}', fontsize=16, fontweight='bold', y=0.98)
 
-    for ext, data in by_ext.items():
-        ns = [d['n'] for d in data]
+    for ext, g in grouped.items():
         color = TYPE_COLORS.get(ext, '#ffffff')
 
         # Left: File generation time
-        gen_times = [d['gen_time'] for d in data]
-        ax1.plot(ns, gen_times, 'o-', label=ext, color=color, markersize=5, linewidth=2)
+        ax1.plot(g['n'], g['gen'], 'o-', label=ext, color=color, markersize=5, linewidth=2)
 
         # Right: Success rate
-        success = [d['processed_count'] / d['n'] * 100 if d['n'] > 0 else 0 for d in data]
-        ax2.plot(ns, success, 's-', label=ext, color=color, markersize=5, linewidth=2)
+        ax2.plot(g['n'], g['success'], 's-', label=ext, color=color, markersize=5, linewidth=2)
 
     ax1.set_xlabel('Number of Files (N)')
     ax1.set_ylabel('Generation Time (seconds)')
@@ -726,9 +1190,9 @@ def plot_graphs(results, project_root):
 
     plt.tight_layout(rect=[0, 0, 1, 0.94])
     path4 = os.path.join(graphs_dir, 'generation_and_success.png')
-    fig.savefig(path4, dpi=150, bbox_inches='tight')
-    plt.close(fig)
+    fig.savefig(path4, dpi=dpi, bbox_inches='tight')
     print(f"  Saved: {path4}")
+    plt.close(fig)
 
     print(f"\n✅ All graphs saved to: {graphs_dir}")
 
@@ -744,7 +1208,19 @@ def main():
                         help=f"Custom N values. Default: {N_VALUES}")
     parser.add_argument('--workers', type=int, default=4,
                         help="Number of worker threads (default: 4)")
+    parser.add_argument('--parallel', type=int, default=1, metavar='K',
+                        help="Run up to K tests at once, each with its own app data dir (default: 1)")
+    parser.add_argument('--capture-logs', action='store_true',
+                        help="Keep each app subprocess's output and show it on failure")
+    parser.add_argument('--reuse-app', action='store_true',
+                        help="Start the app once and reset it between tests over a control socket")
+    parser.add_argument('--exact-count', action='store_true',
+                        help="Count processed files by parsing the registry (slower, deduplicated)")
+    parser.add_argument('--high-dpi', action='store_true',
+                        help=f"Save graphs at {GRAPH_HIGH_DPI} dpi instead of {GRAPH_DPI}")
     args = parser.parse_args()
+    if args.reuse_app and args.parallel > 1:
+        parser.error("--reuse-app shares one app between tests; it can't be combined with --parallel")
 
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     mock_mode = args.mock
@@ -774,19 +1250,44 @@ def main():
     print(f"File types: {file_types}")
     print(f"N values:   {n_values}")
     print(f"Workers:    {args.workers}")
+    print(f"Parallel:   {args.parallel}")
     print(f"{'=' * 60}\n")
 
     all_results = []
 
-    for ext in file_types:
-        print(f"\n{'─' * 50}")
-        print(f"Testing: {ext}")
-        print(f"{'─' * 50}")
-
-        for n in n_values:
-            print(f"\n[{ext} x {n}]")
-            result = run_single_test(ext, n, mock_mode, project_root)
-            all_results.append(result)
+    if args.parallel > 1:
+        # Each test has its own temp dirs, config and app subprocess, and
+        # mostly waits on that subprocess, so several can share the harness.
+        # Their progress output interleaves; each finished test is summarized.
+        with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+            futures = [
+                pool.submit(run_single_test, ext, n, mock_mode, project_root, True, args.capture_logs,
+                            exact_count=args.exact_count)
+                for ext in file_types
+                for n in n_values
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                all_results.append(result)
+                print(f"\n[{result['ext']} x {result['n']}] finished: "
+                      f"{result['processed_count']}/{result['n']} files")
+    else:
+        app = _SharedApp(project_root, args.capture_logs) if args.reuse_app else None
+        try:
+            for ext in file_types:
+                print(f"\n{'─' * 50}")
+                print(f"Testing: {ext}")
+                print(f"{'─' * 50}")
+
+                for n in n_values:
+                    print(f"\n[{ext} x {n}]")
+                    result = run_single_test(ext, n, mock_mode, project_root,
+                                             capture_logs=args.capture_logs, app=app,
+                                             exact_count=args.exact_count)
+                    all_results.append(result)
+        finally:
+            if app is not None:
+                app.close()
 
     # Print and save results
     print_results_table(all_results)
@@ -794,7 +1295,7 @@ def main():
 
     # Generate graphs
     print("\nGenerating graphs...")
-    plot_graphs(all_results, project_root)
+    plot_graphs(all_results, project_root, dpi=GRAPH_HIGH_DPI if args.high_dpi else GRAPH_DPI)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+"""Unit tests for src.batcher.ClassifyBatcher."""
+
+import threading
+import unittest
+
+from src.batcher import ClassifyBatcher
+from src.pool import ElasticThreadPool
+
+
+class _FakeClassifier:
+    """Records the calls the batcher makes and scores text by length."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+        self.singles = []
+        self.lock = threading.Lock()
+
+    def classify(self, text):
+        with self.lock:
+            self.singles.append(text)
+        if self.fail:
+            raise ValueError("model failed")
+        return ('single', len(text))
+
+    def classify_batch(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise ValueError("model failed")
+        return [('batch', len(text)) for text in texts]
+
+
+class ClassifyBatcherTest(unittest.TestCase):
+
+    def test_texts_in_one_window_share_a_batch(self):
+        fake = _FakeClassifier()
+        batcher = ClassifyBatcher(fake.classify_batch, batch_size=8, wait_ms=500, classify=fake.classify)
+        try:
+            futures = [batcher.submit('x' * i) for i in range(1, 6)]
+            results = [future.result(timeout=5) for future in futures]
+        finally:
+            batcher.close()
+        self.assertEqual(results, [('batch', i) for i in range(1, 6)])
+        self.assertEqual(fake.batches, [['x', 'xx', 'xxx', 'xxxx', 'xxxxx']])
+        self.assertEqual(fake.singles, [])
+
+    def test_batches_are_capped_at_batch_size(self):
+        fake = _FakeClassifier()
+        batcher = ClassifyBatcher(fake.classify_batch, batch_size=2, wait_ms=500)
+        try:
+            futures = [batcher.submit(str(i)) for i in range(5)]
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            batcher.close()
+        self.assertTrue(all(len(batch) <= 2 for batch in fake.batches))
+        self.assertEqual(sum(fake.batches, []), ['0', '1', '2', '3', '4'])
+
+    def test_single_text_uses_classify(self):
+        fake = _FakeClassifier()
+        batcher = ClassifyBatcher(fake.classify_batch, wait_ms=1, classify=fake.classify)
+        try:
+            self.assertEqual(batcher.submit('abc').result(timeout=5), ('single', 3))
+        finally:
+            batcher.close()
+        self.assertEqual(fake.singles, ['abc'])
+        self.assertEqual(fake.batches, [])
+
+    def test_error_is_set_on_every_future(self):
+        fake = _FakeClassifier(fail=True)
+        batcher = ClassifyBatcher(fake.classify_batch, batch_size=8, wait_ms=500)
+        try:
+            futures = [batcher.submit(str(i)) for i in range(3)]
+            for future in futures:
+                with self.assertRaisesRegex(ValueError, "model failed"):
+                    future.result(timeout=5)
+            # The batcher keeps serving after a failed batch
+            fake.fail = False
+            self.assertEqual(batcher.submit('ok').result(timeout=5), ('batch', 2))
+        finally:
+            batcher.close()
+
+    def test_single_text_error_is_propagated(self):
+        fake = _FakeClassifier(fail=True)
+        batcher = ClassifyBatcher(fake.classify_batch, wait_ms=1, classify=fake.classify)
+        try:
+            with self.assertRaisesRegex(ValueError, "model failed"):
+                batcher.submit('abc').result(timeout=5)
+        finally:
+            batcher.close()
+
+    def test_cancelled_futures_are_skipped(self):
+        fake = _FakeClassifier()
+        batcher = ClassifyBatcher(fake.classify_batch, batch_size=8, wait_ms=500)
+        try:
+            cancelled = batcher.submit('drop')
+            kept = batcher.submit('keep')
+            self.assertTrue(cancelled.cancel())
+            self.assertEqual(kept.result(timeout=5), ('batch', 4))
+        finally:
+            batcher.close()
+        self.assertEqual(fake.batches, [['keep']])
+
+    def test_executor_runs_batches(self):
+        fake = _FakeClassifier()
+        pool = ElasticThreadPool(1, 2)
+        batcher = ClassifyBatcher(fake.classify_batch, batch_size=4, wait_ms=50, executor=pool)
+        try:
+            futures = [batcher.submit(str(i)) for i in range(10)]
+            results = [future.result(timeout=5) for future in futures]
+        finally:
+            batcher.close()
+            pool.shutdown(wait=True)
+        self.assertEqual(results, [('batch', len(str(i))) for i in range(10)])
+
+    def test_close_flushes_queued_texts(self):
+        fake = _FakeClassifier()
+        batcher = ClassifyBatcher(fake.classify_batch, batch_size=8, wait_ms=10000)
+        futures = [batcher.submit(str(i)) for i in range(3)]
+        batcher.close()
+        self.assertEqual([future.result(timeout=0) for future in futures], [('batch', 1)] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
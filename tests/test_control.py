@@ -0,0 +1,63 @@
+"""Unit tests for src.control.ControlServer."""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from src.control import ControlServer
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix domain sockets unavailable")
+class ControlServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.dir, 'control.sock')
+        self.requests = []
+
+        def reset(request):
+            self.requests.append(request)
+            return {'echo': request['config']}
+
+        def fail(request):
+            raise RuntimeError("handler failed")
+
+        self.server = ControlServer(self.socket_path, {'reset': reset, 'fail': fail})
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.dir)
+
+    def _send(self, request):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as reader:
+                return json.loads(reader.readline())
+
+    def test_handler_reply_is_merged(self):
+        reply = self._send({'cmd': 'reset', 'config': 'a.json'})
+        self.assertEqual(reply, {'ok': True, 'echo': 'a.json'})
+        self.assertEqual(self.requests, [{'cmd': 'reset', 'config': 'a.json'}])
+
+    def test_unknown_command(self):
+        reply = self._send({'cmd': 'nope'})
+        self.assertFalse(reply['ok'])
+        self.assertIn('unknown command', reply['error'])
+
+    def test_handler_error_is_returned(self):
+        self.assertEqual(self._send({'cmd': 'fail'}), {'ok': False, 'error': 'handler failed'})
+        self.assertTrue(self._send({'cmd': 'reset', 'config': 'b.json'})['ok'])
+
+    def test_stop_removes_socket_file(self):
+        self.server.stop()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
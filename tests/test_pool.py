@@ -0,0 +1,94 @@
+"""Unit tests for src.pool.ElasticThreadPool."""
+
+import threading
+import time
+import unittest
+
+from src.pool import ElasticThreadPool
+
+
+def _wait_until(predicate, timeout=5.0):
+    """Poll predicate until it is true or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class ElasticThreadPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.pools = []
+
+    def tearDown(self):
+        self.release.set()
+        for pool in self.pools:
+            pool.shutdown(wait=True)
+
+    def _pool(self, core, maximum, idle_timeout=30.0):
+        pool = ElasticThreadPool(core, maximum, idle_timeout=idle_timeout)
+        self.pools.append(pool)
+        return pool
+
+    def test_grows_to_max_under_burst(self):
+        pool = self._pool(1, 4)
+        futures = [pool.submit(self.release.wait) for _ in range(10)]
+        self.assertTrue(_wait_until(lambda: pool.num_threads == 4))
+        self.assertEqual(pool.num_threads, 4)
+        self.release.set()
+        for future in futures:
+            self.assertTrue(future.result(timeout=5))
+
+    def test_idle_threads_above_core_exit(self):
+        pool = self._pool(2, 5, idle_timeout=0.05)
+        futures = [pool.submit(self.release.wait) for _ in range(5)]
+        self.assertTrue(_wait_until(lambda: pool.num_threads == 5))
+        self.release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertTrue(_wait_until(lambda: pool.num_threads == 2))
+        time.sleep(0.2)  # Core threads stay even after several idle timeouts
+        self.assertEqual(pool.num_threads, 2)
+
+    def test_scale_workers_shrinks_after_current_tasks(self):
+        pool = self._pool(1, 4)
+        futures = [pool.submit(self.release.wait) for _ in range(4)]
+        self.assertTrue(_wait_until(lambda: pool.num_threads == 4))
+        pool.scale_workers(2)
+        self.assertEqual(pool.num_threads, 4)  # Busy threads finish their task first
+        self.release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertTrue(_wait_until(lambda: pool.num_threads == 2))
+
+    def test_exception_is_set_on_future(self):
+        pool = self._pool(1, 2)
+        future = pool.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+        self.assertEqual(pool.submit(lambda x: x * 2, 21).result(timeout=5), 42)
+
+    def test_shutdown_drains_queue_and_stops_threads(self):
+        pool = self._pool(1, 2)
+        done = []
+        gate = pool.submit(self.release.wait)
+        for i in range(5):
+            pool.submit(done.append, i)
+        threading.Timer(0.1, self.release.set).start()
+        pool.shutdown(wait=True)
+        self.assertTrue(gate.done())
+        self.assertEqual(sorted(done), list(range(5)))
+        self.assertEqual(pool.num_threads, 0)
+
+    def test_submit_after_shutdown_raises(self):
+        pool = self._pool(1, 1)
+        pool.shutdown(wait=True)
+        with self.assertRaises(RuntimeError):
+            pool.submit(lambda: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
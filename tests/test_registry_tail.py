@@ -0,0 +1,104 @@
+"""Unit tests for the stress test's incremental registry counter."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.stress_test import _RegistryTail, _registry_signature
+
+
+class RegistryTailTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'processed_files.json')
+        self.log_path = self.path + '.log'
+        self.tail = _RegistryTail(self.path)
+        self.next_ino = 1
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _entry(self):
+        self.next_ino += 1
+        return [1, self.next_ino, 1000]
+
+    def _append(self, entries):
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+
+    def _write_snapshot(self, entries):
+        # Like the app: write a tmp file and rename it over the snapshot
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    def _swap_log(self):
+        open(self.log_path + '.tmp', 'w').close()
+        os.replace(self.log_path + '.tmp', self.log_path)
+
+    def _count(self):
+        return self.tail.count(_registry_signature(self.path))
+
+    def test_missing_files_count_zero(self):
+        self.assertEqual(self._count(), 0)
+
+    def test_counts_appended_lines(self):
+        self._append([self._entry() for _ in range(3)])
+        self.assertEqual(self._count(), 3)
+        self._append([self._entry() for _ in range(2)])
+        self.assertEqual(self._count(), 5)
+
+    def test_partial_line_is_not_counted(self):
+        self._append([self._entry()])
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write('[1, 99, ')
+        self.assertEqual(self._count(), 1)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write('1000]\n')
+        self.assertEqual(self._count(), 2)
+
+    def test_compaction_is_not_double_counted(self):
+        entries = [self._entry() for _ in range(4)]
+        self._append(entries)
+        self.assertEqual(self._count(), 4)
+
+        # Snapshot replaced, old log not yet swapped out
+        self._write_snapshot(entries)
+        self.assertEqual(self._count(), 4)
+
+        self._swap_log()
+        self.assertEqual(self._count(), 4)
+
+        self._append([self._entry()])
+        self.assertEqual(self._count(), 5)
+
+    def test_compaction_with_appends_before_swap(self):
+        entries = [self._entry() for _ in range(2)]
+        self._append(entries)
+        self.assertEqual(self._count(), 2)
+        self._write_snapshot(entries)
+        self._swap_log()
+        self._append([self._entry(), self._entry()])
+        self.assertEqual(self._count(), 4)
+
+    def test_reset_to_empty(self):
+        self._append([self._entry() for _ in range(3)])
+        self.assertEqual(self._count(), 3)
+        self._write_snapshot([])
+        self._swap_log()
+        self.assertEqual(self._count(), 0)
+
+    def test_log_truncated_in_place(self):
+        self._append([self._entry() for _ in range(3)])
+        self.assertEqual(self._count(), 3)
+        open(self.log_path, 'w').close()
+        self._append([self._entry()])
+        self.assertEqual(self._count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()